@@ -0,0 +1,157 @@
+import json
+import os
+import sys
+
+
+# Same thresholds the table used to hard-code
+DEFAULT_RULES = [
+    {"metric": "CPU Temperature", "above": 80, "level": "critical", "hysteresis": 3, "duration": 5},
+    {"metric": "CPU Temperature", "above": 60, "level": "warning", "hysteresis": 3},
+    {"metric": "GPU Temperature", "above": 85, "level": "critical", "hysteresis": 3, "duration": 5},
+    {"metric": "GPU Temperature", "above": 70, "level": "warning", "hysteresis": 3},
+    # Usage and power swing past these all the time; colour only, no notification
+    {"metric": "CPU Usage", "above": 90, "level": "critical", "hysteresis": 5, "notify": False},
+    {"metric": "CPU Usage", "above": 70, "level": "warning", "hysteresis": 5},
+    {"metric": "GPU Power", "above": 110, "level": "critical", "hysteresis": 5, "notify": False},
+    {"metric": "GPU Power", "above": 90, "level": "warning", "hysteresis": 5},
+]
+
+LEVELS = {"warning": 1, "critical": 2}
+
+LEVEL_COLORS = {"warning": "orange", "critical": "red"}
+
+
+class Rule:
+    """
+    One compiled threshold rule. Fires once `value` has been past the
+    threshold for `duration` seconds and clears once it is back by more
+    than `hysteresis`.
+    """
+
+    def __init__(self, spec):
+        self.metric = spec["metric"]
+        if "above" in spec:
+            self.threshold = float(spec["above"])
+            self.sign = 1.0
+        else:
+            self.threshold = float(spec["below"])
+            self.sign = -1.0
+        self.level = spec.get("level", "warning")
+        if self.level not in LEVELS:
+            raise ValueError(f"Unknown alert level {self.level!r}")
+        self.hysteresis = float(spec.get("hysteresis", 0))
+        self.duration = float(spec.get("duration", 0))
+        self.notify = bool(spec.get("notify", self.level == "critical"))
+        self.active = False
+        self.pending_since = None
+
+    def describe(self, value):
+        direction = "above" if self.sign > 0 else "below"
+        return f"{self.metric} is {value:g}, {direction} {self.threshold:g}"
+
+
+class AlertEngine:
+    """
+    Rules compiled into a metric -> [Rule] table, so evaluating a sample only
+    touches the rules for that metric. `on_change(rule, active, value)` is
+    called when a rule fires or clears.
+    """
+
+    def __init__(self, rules=None, on_change=None):
+        self.on_change = on_change
+        self.active_counts = dict.fromkeys(LEVELS, 0)
+        self.compile(DEFAULT_RULES if rules is None else rules)
+
+    def compile(self, specs):
+        table = {}
+        for spec in specs:
+            rule = Rule(spec)
+            table.setdefault(rule.metric, []).append(rule)
+        # Most severe first, so level() can stop at the first active rule
+        for rules in table.values():
+            rules.sort(key=lambda r: LEVELS[r.level], reverse=True)
+        self.table = table
+        self.active_counts = dict.fromkeys(LEVELS, 0)
+
+    def metrics(self):
+        return list(self.table)
+
+    def evaluate(self, key, value, now):
+        rules = self.table.get(key)
+        if rules is not None:
+            self.evaluate_rules(rules, value, now)
+
+    def rules_for(self, key):
+        return self.table.get(key, ())
+
+    def evaluate_rules(self, rules, value, now):
+        """
+        evaluate() for a rule list already looked up with rules_for().
+        """
+        for rule in rules:
+            excess = (value - rule.threshold) * rule.sign
+            if rule.active:
+                if excess < -rule.hysteresis:
+                    rule.active = False
+                    rule.pending_since = None
+                    self.active_counts[rule.level] -= 1
+                    if self.on_change:
+                        self.on_change(rule, False, value)
+            elif excess > 0:
+                if rule.pending_since is None:
+                    rule.pending_since = now
+                if now - rule.pending_since >= rule.duration:
+                    rule.active = True
+                    self.active_counts[rule.level] += 1
+                    if self.on_change:
+                        self.on_change(rule, True, value)
+            else:
+                rule.pending_since = None
+
+    def level(self, key):
+        """
+        Highest active level for `key`, or None.
+        """
+        for rule in self.table.get(key, ()):
+            if rule.active:
+                return rule.level
+        return None
+
+    def highest_level(self):
+        """
+        Most severe level active on any metric, or None.
+        """
+        for level in sorted(LEVELS, key=LEVELS.get, reverse=True):
+            if self.active_counts[level]:
+                return level
+        return None
+
+
+def default_rules_path():
+    # Where QSettings("Linfo", "LinfoApp") keeps its config on Linux
+    config_home = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    return os.path.join(config_home, "Linfo", "alerts.json")
+
+
+def load_rules(path):
+    """
+    Read rules from a JSON list at `path`, writing the defaults there on
+    first run so they can be edited. Falls back to the defaults on error.
+    """
+    if not os.path.exists(path):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(DEFAULT_RULES, f, indent=2)
+        except OSError:
+            pass
+        return DEFAULT_RULES
+    try:
+        with open(path) as f:
+            rules = json.load(f)
+        # Compile once here so a bad file is reported instead of crashing later
+        AlertEngine(rules)
+        return rules
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"Warning: Could not load alert rules from {path}: {e}", file=sys.stderr)
+        return DEFAULT_RULES
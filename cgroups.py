@@ -0,0 +1,196 @@
+import heapq
+import os
+import resource
+import time
+
+from sysfs import SysfsReader
+
+
+# Candidate cgroup v2 mount points (unified, then hybrid layout)
+CGROUP_ROOTS = ["/sys/fs/cgroup", "/sys/fs/cgroup/unified"]
+
+# Cgroups read per tick; bigger hierarchies are covered over several ticks
+TICK_BUDGET = 200
+
+# How often the hierarchy is re-walked to pick up new and removed cgroups
+REINDEX_SECONDS = 30
+
+PRESSURE_FILES = ("cpu.pressure", "memory.pressure", "io.pressure")
+
+SORT_KEYS = {
+    "cpu": lambda row: row.cpu,
+    "memory": lambda row: row.memory,
+    "io": lambda row: row.read + row.write,
+}
+
+
+def find_cgroup_root():
+    for root in CGROUP_ROOTS:
+        if os.path.exists(os.path.join(root, "cgroup.controllers")):
+            return root
+    return None
+
+
+def parse_keyed(data):
+    """
+    Parse "key value" lines (cpu.stat) into a dict of ints.
+    """
+    values = {}
+    for line in data.splitlines():
+        key, _, value = line.partition(b" ")
+        if value.strip().isdigit():
+            values[key] = int(value)
+    return values
+
+
+def parse_io_stat(data):
+    """
+    Sum rbytes/wbytes over every device line of io.stat.
+    """
+    rbytes = wbytes = 0
+    for line in data.splitlines():
+        for field in line.split()[1:]:
+            if field.startswith(b"rbytes="):
+                rbytes += int(field[7:])
+            elif field.startswith(b"wbytes="):
+                wbytes += int(field[7:])
+    return rbytes, wbytes
+
+
+def parse_pressure(data):
+    """
+    The "some avg10" figure of a PSI file, in percent.
+    """
+    for field in data.split(b"\n", 1)[0].split():
+        if field.startswith(b"avg10="):
+            return float(field[6:])
+    return None
+
+
+class CgroupRow:
+    __slots__ = ("path", "name", "cpu", "memory", "read", "write", "pressure", "last", "sampled")
+
+    def __init__(self, path, name):
+        self.path = path
+        self.name = name
+        self.cpu = 0.0
+        self.memory = 0
+        self.read = 0.0
+        self.write = 0.0
+        # cpu, memory, io "some avg10" in percent, None when PSI is off
+        self.pressure = (None, None, None)
+        # (timestamp, usage_usec, rbytes, wbytes) from the previous read
+        self.last = None
+        self.sampled = False
+
+
+class CgroupCollector:
+    """
+    Per-cgroup CPU, memory, IO and pressure from cgroup v2.
+
+    The hierarchy is walked once into an index (and again every
+    REINDEX_SECONDS). Each tick reads at most TICK_BUDGET cgroups, resuming
+    where the previous tick stopped, so a host with thousands of cgroups
+    has a bounded per-tick cost. Rates are computed per cgroup against its
+    own previous read. Attribute files stay open between reads.
+    """
+
+    def __init__(self, root=None, budget=TICK_BUDGET):
+        self.root = root or find_cgroup_root()
+        self.budget = budget
+        # Created on the first update(), which also raises the fd limit
+        self.reader = None
+        self.rows = {}
+        self.order = []
+        self.cursor = 0
+        # Last path read, so a reindex resumes the scan instead of restarting it
+        self.last_path = None
+        self.indexed_at = None
+
+    @staticmethod
+    def _fd_budget():
+        # Six files per cgroup adds up quickly; lift the soft limit if allowed
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        target = hard if hard != resource.RLIM_INFINITY else 65536
+        target = min(target, 65536)
+        if soft < target:
+            try:
+                resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+                soft = target
+            except (ValueError, OSError):
+                pass
+        return max(64, soft // 2)
+
+    @property
+    def available(self):
+        return self.root is not None
+
+    def reindex(self):
+        rows = {}
+        for dirpath, dirnames, _ in os.walk(self.root):
+            if dirpath == self.root:
+                continue
+            row = self.rows.get(dirpath)
+            if row is None:
+                row = CgroupRow(dirpath, os.path.relpath(dirpath, self.root))
+            rows[dirpath] = row
+        for path in self.rows.keys() - rows.keys():
+            for name in ("cpu.stat", "memory.current", "io.stat") + PRESSURE_FILES:
+                self.reader.forget(os.path.join(path, name))
+        self.rows = rows
+        self.order = list(rows)
+        try:
+            self.cursor = (self.order.index(self.last_path) + 1) % len(self.order)
+        except ValueError:
+            # Last path went away; stay at roughly the same position
+            self.cursor = self.cursor % len(self.order) if self.order else 0
+
+    def _read(self, row, now):
+        reader = self.reader
+        cpu_stat = reader.read_bytes(os.path.join(row.path, "cpu.stat"))
+        if cpu_stat is None:
+            return False
+        usage = parse_keyed(cpu_stat).get(b"usage_usec", 0)
+        memory = reader.read_int(os.path.join(row.path, "memory.current"))
+        io_stat = reader.read_bytes(os.path.join(row.path, "io.stat"))
+        rbytes, wbytes = parse_io_stat(io_stat) if io_stat else (0, 0)
+        pressure = []
+        for name in PRESSURE_FILES:
+            data = reader.read_bytes(os.path.join(row.path, name))
+            pressure.append(parse_pressure(data) if data else None)
+
+        if row.last is not None and now > row.last[0]:
+            dt = now - row.last[0]
+            row.cpu = round(max(0, usage - row.last[1]) / (dt * 1e4), 1)
+            row.read = round(max(0, rbytes - row.last[2]) / dt / 1e6, 1)
+            row.write = round(max(0, wbytes - row.last[3]) / dt / 1e6, 1)
+            row.sampled = True
+        row.last = (now, usage, rbytes, wbytes)
+        row.memory = memory or 0
+        row.pressure = tuple(pressure)
+        return True
+
+    def update(self, now=None):
+        if self.root is None:
+            return
+        now = time.monotonic() if now is None else now
+        if self.reader is None:
+            self.reader = SysfsReader(max_open=self._fd_budget())
+        if self.indexed_at is None or now - self.indexed_at >= REINDEX_SECONDS:
+            self.reindex()
+            self.indexed_at = now
+        if not self.order:
+            return
+        count = min(self.budget, len(self.order))
+        for _ in range(count):
+            path = self.order[self.cursor]
+            self.cursor = (self.cursor + 1) % len(self.order)
+            self.last_path = path
+            row = self.rows.get(path)
+            if row is not None and not self._read(row, now):
+                # Removed since the last index
+                del self.rows[path]
+
+    def top(self, n, sort="cpu"):
+        sampled = (row for row in self.rows.values() if row.sampled)
+        return heapq.nlargest(n, sampled, key=SORT_KEYS[sort])
@@ -0,0 +1,112 @@
+import struct
+
+
+# Delta-of-delta buckets for timestamps: (control bits, payload bits).
+# A payload of n bits holds values in [-(2^(n-1) - 1), 2^(n-1)].
+DOD_BUCKETS = [
+    ("10", 7),
+    ("110", 9),
+    ("1110", 12),
+]
+DOD_FALLBACK = ("1111", 64)
+
+
+def float_bits(value):
+    return struct.unpack(">Q", struct.pack(">d", value))[0]
+
+
+def bits_float(bits):
+    return struct.unpack(">d", struct.pack(">Q", bits))[0]
+
+
+def encode_block(times_ms, values):
+    """
+    Gorilla-encode one block of samples. `times_ms` are integer
+    milliseconds. Timestamps are stored as delta-of-delta and values as the
+    XOR against the previous value, so a metric sampled at a steady rate
+    whose value does not change costs two bits per sample.
+    """
+    out = [format(times_ms[0], "064b"), format(float_bits(values[0]), "064b")]
+
+    prev_time = times_ms[0]
+    prev_delta = 0
+    for t in times_ms[1:]:
+        delta = t - prev_time
+        dod = delta - prev_delta
+        prev_time, prev_delta = t, delta
+        if dod == 0:
+            out.append("0")
+            continue
+        for control, width in DOD_BUCKETS + [DOD_FALLBACK]:
+            half = 1 << (width - 1)
+            if -half < dod <= half:
+                break
+        out.append(control + format(dod + half - 1, f"0{width}b"))
+
+    prev_bits = float_bits(values[0])
+    # Leading/trailing zero counts of the last explicitly stored XOR window
+    window = None
+    for value in values[1:]:
+        bits = float_bits(value)
+        xor = bits ^ prev_bits
+        prev_bits = bits
+        if xor == 0:
+            out.append("0")
+            continue
+        leading = min(31, 64 - xor.bit_length())
+        trailing = (xor & -xor).bit_length() - 1
+        if window is not None and leading >= window[0] and trailing >= window[1]:
+            size = 64 - window[0] - window[1]
+            out.append("10" + format(xor >> window[1], f"0{size}b"))
+        else:
+            size = 64 - leading - trailing
+            window = (leading, trailing)
+            # A 64-bit window is stored as 0 in the 6-bit length field
+            out.append("11" + format(leading, "05b") + format(size % 64, "06b")
+                       + format(xor >> trailing, f"0{size}b"))
+
+    bits = "".join(out)
+    bits += "0" * (-len(bits) % 8)
+    return int(bits, 2).to_bytes(len(bits) // 8, "big")
+
+
+def decode_block(data, count):
+    """
+    Inverse of encode_block: ([times_ms], [values]) for `count` samples.
+    """
+    bits = format(int.from_bytes(data, "big"), f"0{len(data) * 8}b")
+    pos = 128
+    times = [int(bits[:64], 2)]
+    delta = 0
+    for _ in range(count - 1):
+        if bits[pos] == "0":
+            pos += 1
+        else:
+            for control, width in DOD_BUCKETS + [DOD_FALLBACK]:
+                if bits.startswith(control, pos):
+                    break
+            pos += len(control)
+            half = 1 << (width - 1)
+            delta += int(bits[pos:pos + width], 2) - half + 1
+            pos += width
+        times.append(times[-1] + delta)
+
+    prev_bits = int(bits[64:128], 2)
+    values = [bits_float(prev_bits)]
+    leading = trailing = 0
+    for _ in range(count - 1):
+        if bits[pos] == "0":
+            pos += 1
+        else:
+            if bits[pos + 1] == "1":
+                leading = int(bits[pos + 2:pos + 7], 2)
+                size = int(bits[pos + 7:pos + 13], 2) or 64
+                trailing = 64 - leading - size
+                pos += 13
+            else:
+                pos += 2
+            size = 64 - leading - trailing
+            prev_bits ^= int(bits[pos:pos + size], 2) << trailing
+            pos += size
+        values.append(bits_float(prev_bits))
+    return times, values
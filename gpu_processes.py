@@ -0,0 +1,156 @@
+import os
+import subprocess
+import time
+
+
+# pmon utilisation lines older than this (seconds) belong to exited processes
+PMON_STALE = 3.0
+
+
+class GPUProcessCollector:
+    """
+    Per-process GPU memory (MiB) and SM utilisation (%) for NVIDIA cards.
+
+    Uses NVML through pynvml when it is installed, otherwise falls back to one
+    batched `nvidia-smi --query-compute-apps` call per tick for memory and a
+    long-lived `nvidia-smi pmon` whose output is drained without blocking
+    for utilisation (a one-shot pmon waits a whole sample interval).
+    Returns {pid: [mem, util]}, summed over GPUs when a process has contexts
+    on several cards. Call close() when the data is no longer shown.
+    """
+
+    def __init__(self):
+        self.available = True
+        self.nvml = None
+        self.handles = []
+        # Last sample timestamp per handle, so NVML only returns new samples
+        self.last_seen = {}
+        self.pmon = None
+        self.pmon_buffer = b""
+        # (gpu, pid) -> (sm %, time the line was read)
+        self.pmon_util = {}
+        self._init_nvml()
+
+    def _init_nvml(self):
+        try:
+            import pynvml
+            pynvml.nvmlInit()
+            count = pynvml.nvmlDeviceGetCount()
+            self.handles = [pynvml.nvmlDeviceGetHandleByIndex(i) for i in range(count)]
+            self.nvml = pynvml
+        except Exception:
+            self.nvml = None
+
+    def collect(self):
+        if not self.available:
+            return {}
+        if self.nvml is not None:
+            return self._collect_nvml()
+        return self._collect_smi()
+
+    def _collect_nvml(self):
+        nvml = self.nvml
+        usage = {}
+        for handle in self.handles:
+            try:
+                procs = nvml.nvmlDeviceGetComputeRunningProcesses(handle)
+            except nvml.NVMLError:
+                procs = []
+            for proc in procs:
+                entry = usage.setdefault(proc.pid, [0, 0])
+                if proc.usedGpuMemory:
+                    entry[0] += proc.usedGpuMemory // (1024 * 1024)
+
+            try:
+                samples = nvml.nvmlDeviceGetProcessUtilization(handle, self.last_seen.get(handle, 0))
+            except nvml.NVMLError:
+                # NVML_ERROR_NOT_FOUND just means no new samples since last tick
+                samples = []
+            for sample in samples:
+                entry = usage.setdefault(sample.pid, [0, 0])
+                entry[1] += sample.smUtil
+                if sample.timeStamp > self.last_seen.get(handle, 0):
+                    self.last_seen[handle] = sample.timeStamp
+        return usage
+
+    def _collect_smi(self):
+        usage = {}
+        try:
+            output = subprocess.check_output(
+                ["nvidia-smi", "--query-compute-apps=pid,used_memory", "--format=csv,noheader,nounits"],
+                text=True, stderr=subprocess.DEVNULL
+            )
+        except FileNotFoundError:
+            # No NVIDIA driver on this host; stop trying.
+            self.available = False
+            return usage
+        except subprocess.CalledProcessError:
+            return usage
+
+        for line in output.splitlines():
+            parts = [p.strip() for p in line.split(",")]
+            if len(parts) != 2 or not parts[0].isdigit():
+                continue
+            entry = usage.setdefault(int(parts[0]), [0, 0])
+            if parts[1].isdigit():
+                entry[0] += int(parts[1])
+
+        now = time.monotonic()
+        self._drain_pmon(now)
+        for (gpu, pid), (util, seen) in list(self.pmon_util.items()):
+            if now - seen > PMON_STALE:
+                del self.pmon_util[(gpu, pid)]
+                continue
+            usage.setdefault(pid, [0, 0])[1] += util
+        return usage
+
+    def _drain_pmon(self, now):
+        if self.pmon is None or self.pmon.poll() is not None:
+            if self.pmon is not None:
+                self.pmon.stdout.close()
+            try:
+                self.pmon = subprocess.Popen(
+                    ["nvidia-smi", "pmon", "-s", "u", "-d", "1"],
+                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+                )
+            except OSError:
+                self.pmon = None
+                return
+            os.set_blocking(self.pmon.stdout.fileno(), False)
+            self.pmon_buffer = b""
+        try:
+            data = os.read(self.pmon.stdout.fileno(), 65536)
+        except BlockingIOError:
+            return
+        while data:
+            self.pmon_buffer += data
+            try:
+                data = os.read(self.pmon.stdout.fileno(), 65536)
+            except BlockingIOError:
+                break
+        lines = self.pmon_buffer.split(b"\n")
+        self.pmon_buffer = lines.pop()
+
+        # "# gpu  pid  type  sm  mem  enc  dec  command", "-" when not sampled
+        for line in lines:
+            if line.startswith(b"#"):
+                continue
+            parts = line.split()
+            if len(parts) < 4 or not parts[0].isdigit() or not parts[1].isdigit():
+                continue
+            if parts[3].isdigit():
+                self.pmon_util[(int(parts[0]), int(parts[1]))] = (int(parts[3]), now)
+
+    def close(self):
+        """
+        Stop the background pmon, if any.
+        """
+        if self.pmon is not None:
+            self.pmon.terminate()
+            try:
+                self.pmon.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                self.pmon.kill()
+            self.pmon.stdout.close()
+            self.pmon = None
+        self.pmon_util.clear()
@@ -0,0 +1,162 @@
+import glob
+import os
+import re
+
+from sysfs import SysfsReader
+
+
+VENDOR_AMD = "0x1002"
+VENDOR_INTEL = "0x8086"
+
+VENDOR_NAMES = {
+    VENDOR_AMD: "AMD",
+    VENDOR_INTEL: "Intel",
+}
+
+# Matches the active line of pp_dpm_sclk / pp_dpm_mclk, e.g. "1: 1800Mhz *"
+DPM_ACTIVE_RE = re.compile(rb"^\s*\d+:\s*(\d+)\s*[Mm][Hh]z\s*\*", re.MULTILINE)
+
+# Metric names of SysfsGPU.read()'s values, in order
+METRICS = [
+    "GPU Usage",
+    "GPU Core Frequency",
+    "GPU Memory Frequency",
+    "GPU Memory Usage",
+    "GPU Memory",
+    "GPU Temperature",
+    "GPU Throttle Temperature",
+    "GPU Power",
+    "GPU Fan Speed",
+    "GPU Fan Speed RPM",
+]
+
+
+class SysfsGPU:
+    """
+    A single amdgpu / i915 / xe card read straight from /sys/class/drm.
+    All paths are resolved once at discovery; each tick is only preads.
+    """
+
+    def __init__(self, card_path, reader):
+        self.card_path = card_path
+        self.device_path = os.path.join(card_path, "device")
+        self.reader = reader
+        self.vendor = (reader.read(os.path.join(self.device_path, "vendor")) or "").lower()
+        self.driver = self._driver_name()
+        self.hwmon_path = self._find_hwmon()
+        self.paths = self._resolve_paths()
+
+    def _driver_name(self):
+        try:
+            return os.path.basename(os.readlink(os.path.join(self.device_path, "driver")))
+        except OSError:
+            return "unknown"
+
+    def _find_hwmon(self):
+        hwmons = sorted(glob.glob(os.path.join(self.device_path, "hwmon", "hwmon*")))
+        return hwmons[0] if hwmons else None
+
+    def _first_existing(self, *candidates):
+        for path in candidates:
+            if path and os.path.exists(path):
+                return path
+        return None
+
+    def _hwmon(self, name):
+        if self.hwmon_path is None:
+            return None
+        return os.path.join(self.hwmon_path, name)
+
+    def _resolve_paths(self):
+        dev = self.device_path
+        xe_freq = sorted(glob.glob(os.path.join(dev, "tile0", "gt*", "freq0")))
+        xe_freq = xe_freq[0] if xe_freq else None
+        return {
+            "busy": self._first_existing(os.path.join(dev, "gpu_busy_percent")),
+            "sclk": self._first_existing(os.path.join(dev, "pp_dpm_sclk")),
+            "mclk": self._first_existing(os.path.join(dev, "pp_dpm_mclk")),
+            "core_mhz": self._first_existing(
+                os.path.join(self.card_path, "gt_act_freq_mhz"),
+                os.path.join(self.card_path, "gt_cur_freq_mhz"),
+                xe_freq and os.path.join(xe_freq, "act_freq"),
+                xe_freq and os.path.join(xe_freq, "cur_freq"),
+            ),
+            "vram_used": self._first_existing(os.path.join(dev, "mem_info_vram_used")),
+            "vram_total": self._first_existing(os.path.join(dev, "mem_info_vram_total")),
+            "temp": self._first_existing(self._hwmon("temp1_input")),
+            "temp_crit": self._first_existing(self._hwmon("temp1_crit")),
+            "power": self._first_existing(self._hwmon("power1_average"), self._hwmon("power1_input")),
+            "fan_rpm": self._first_existing(self._hwmon("fan1_input")),
+            "pwm": self._first_existing(self._hwmon("pwm1")),
+        }
+
+    def name(self):
+        product = self.reader.read(os.path.join(self.device_path, "product_name"))
+        if product:
+            return product
+        device_id = self.reader.read(os.path.join(self.device_path, "device")) or "?"
+        vendor = VENDOR_NAMES.get(self.vendor, self.vendor)
+        return f"{vendor} GPU [{device_id}] ({self.driver})"
+
+    def _int(self, key):
+        path = self.paths[key]
+        if path is None:
+            return None
+        return self.reader.read_int(path)
+
+    def _dpm_mhz(self, key):
+        path = self.paths[key]
+        if path is None:
+            return None
+        data = self.reader.read_bytes(path)
+        if not data:
+            return None
+        match = DPM_ACTIVE_RE.search(data)
+        return int(match.group(1)) if match else None
+
+    def read(self):
+        """
+        Return the current values in METRICS order, so callers can map them
+        to metric IDs once instead of by name on every tick. Missing
+        attributes are reported as 'Unknown'.
+        """
+        core = self._dpm_mhz("sclk")
+        if core is None:
+            core = self._int("core_mhz")
+        used = self._int("vram_used")
+        total = self._int("vram_total")
+        temp = self._int("temp")
+        crit = self._int("temp_crit")
+        power = self._int("power")
+        pwm = self._int("pwm")
+
+        values = [
+            self._int("busy"),
+            core,
+            self._dpm_mhz("mclk"),
+            used // (1024 * 1024) if used is not None else None,
+            total // (1024 * 1024) if total is not None else None,
+            temp / 1000.0 if temp is not None else None,
+            crit // 1000 if crit is not None else None,
+            int(power / 1000000) if power is not None else None,
+            round(pwm * 100 / 255) if pwm is not None else None,
+            self._int("fan_rpm"),
+        ]
+        return ["Unknown" if v is None else v for v in values]
+
+
+def discover_gpus(root="/sys/class/drm", reader=None):
+    """
+    Find AMD and Intel cards under `root`. NVIDIA cards are left to nvidia-smi.
+    `root` can point at a fake tree for testing.
+    """
+    reader = reader or SysfsReader()
+    gpus = []
+    # Skip connectors such as card0-DP-1 and order card2 before card10.
+    cards = [p for p in glob.glob(os.path.join(root, "card[0-9]*"))
+             if re.fullmatch(r"card\d+", os.path.basename(p))]
+    for card_path in sorted(cards, key=lambda p: int(os.path.basename(p)[4:])):
+        vendor = (reader.read(os.path.join(card_path, "device", "vendor")) or "").lower()
+        if vendor in VENDOR_NAMES:
+            gpus.append(SysfsGPU(card_path, reader))
+    return gpus
@@ -0,0 +1,184 @@
+import math
+from collections import deque
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import QPointF
+from PyQt6.QtGui import QPainter, QPainterPath, QPen, QColor, QTransform
+
+
+# Zoom steps in seconds; the last step is replaced by the retention window
+SPANS = [60, 300, 900, 3600, 6 * 3600, 24 * 3600, 7 * 24 * 3600]
+
+
+def format_span(seconds):
+    if seconds < 3600:
+        return f"{seconds // 60} min"
+    if seconds < 24 * 3600:
+        return f"{seconds // 3600} h"
+    return f"{seconds // (24 * 3600)} d"
+
+
+class HistoryGraph(QWidget):
+    """
+    Draws one metric's history from sensor.history.
+
+    The x axis is split into fixed columns of `span / width` seconds. Each
+    column is reduced to a single min/max pair, which is plotted as a
+    vertical stroke. Columns are in absolute time, so once a column has
+    closed it never changes: its stroke is appended to a cached
+    QPainterPath and later ticks only add the newly closed columns.
+    """
+
+    def __init__(self, history, units, parent=None):
+        super().__init__(parent)
+        self.history = history
+        # Callable mapping a metric key to its unit (LinfoApp.get_unit_for_key)
+        self.units = units
+        self.metric = None
+        self.span_index = 0
+        self.setMinimumHeight(120)
+        self._reset()
+
+    def _reset(self):
+        self._key = None
+        self._path = QPainterPath()
+        self._origin = 0
+        self._last_col = None
+        # (column, min, max) for every closed column still on screen
+        self._columns = deque()
+
+    def spans(self):
+        spans = [s for s in SPANS if s < self.history.retention]
+        spans.append(int(self.history.retention))
+        return spans
+
+    def span(self):
+        spans = self.spans()
+        return spans[min(self.span_index, len(spans) - 1)]
+
+    def set_metric(self, key):
+        if key != self.metric:
+            self.metric = key
+            self._reset()
+            self.update()
+
+    def wheelEvent(self, event):
+        step = -1 if event.angleDelta().y() > 0 else 1
+        self.span_index = max(0, min(len(self.spans()) - 1, self.span_index + step))
+        self.update()
+
+    def _column_range(self, data, col, spp):
+        a = data.index(col * spp)
+        b = data.index((col + 1) * spp)
+        return data.min_max(a, b)
+
+    def _extend(self, data, first_col, last_col, spp):
+        """
+        Append strokes for closed columns [first_col, last_col) to the path.
+        """
+        path = self._path
+        a = data.index(first_col * spp)
+        for col in range(first_col, last_col):
+            b = data.index((col + 1) * spp)
+            rng = data.min_max(a, b)
+            a = b
+            if rng is None:
+                # Zoomed in past the sample rate; the next stroke bridges the gap
+                continue
+            x = col - self._origin
+            if self._columns:
+                path.lineTo(x, rng[0])
+            else:
+                path.moveTo(x, rng[0])
+            path.lineTo(x, rng[1])
+            self._columns.append((col, rng[0], rng[1]))
+
+    def _rebuild(self, first_col):
+        # Throw away strokes that scrolled off and start from the cached columns
+        self._path = QPainterPath()
+        self._origin = first_col
+        for i, (col, lo, hi) in enumerate(self._columns):
+            x = col - self._origin
+            if i:
+                self._path.lineTo(x, lo)
+            else:
+                self._path.moveTo(x, lo)
+            self._path.lineTo(x, hi)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, False)
+        width = max(1, self.width())
+        height = self.height()
+        text_color = self.palette().windowText().color()
+        painter.fillRect(self.rect(), self.palette().base())
+
+        data = self.history.get(self.metric) if self.metric else None
+        span = self.span()
+        label = f"{self.metric or 'Select a metric'}  ({format_span(span)}, scroll to zoom)"
+        painter.setPen(text_color)
+        painter.drawText(6, 16, label)
+        if data is None or not len(data):
+            return
+
+        spp = span / width
+        latest_time, latest_value = data.latest()
+        end_col = math.floor(latest_time / spp)
+        first_col = end_col - width + 1
+
+        key = (self.metric, spp)
+        if key != self._key:
+            self._reset()
+            self._key = key
+            self._origin = first_col
+            self._last_col = first_col - 1
+
+        # Forget columns that scrolled off; rebuild the path once it holds
+        # more than a screen's worth of dead strokes.
+        while self._columns and self._columns[0][0] < first_col:
+            self._columns.popleft()
+        if first_col - self._origin > width:
+            self._rebuild(first_col)
+
+        if end_col - 1 > self._last_col:
+            self._extend(data, max(self._last_col + 1, first_col), end_col, spp)
+            self._last_col = end_col - 1
+
+        # The still-open column is recomputed every tick and never cached
+        current = self._column_range(data, end_col, spp)
+
+        lows = [c[1] for c in self._columns]
+        highs = [c[2] for c in self._columns]
+        if current is not None:
+            lows.append(current[0])
+            highs.append(current[1])
+        if not lows:
+            return
+        lo, hi = min(lows), max(highs)
+        if hi - lo < 1e-9:
+            lo, hi = lo - 1, hi + 1
+        margin = (hi - lo) * 0.05
+        lo, hi = lo - margin, hi + margin
+
+        top = 22
+        plot_h = max(1, height - top - 4)
+        scale_y = -plot_h / (hi - lo)
+        transform = QTransform(1, 0, 0, scale_y, -(first_col - self._origin), top + plot_h - lo * scale_y)
+
+        pen = QPen(QColor("#2d89ef"))
+        pen.setCosmetic(True)
+        painter.setPen(pen)
+        painter.setTransform(transform)
+        painter.drawPath(self._path)
+        if current is not None:
+            x = end_col - self._origin
+            if self._columns:
+                last_col, _, last_hi = self._columns[-1]
+                painter.drawLine(QPointF(last_col - self._origin, last_hi), QPointF(x, current[0]))
+            painter.drawLine(QPointF(x, current[0]), QPointF(x, current[1]))
+        painter.resetTransform()
+
+        unit = self.units(self.metric)
+        painter.setPen(text_color)
+        painter.drawText(width - 120, 16, f"{latest_value:g} {unit}")
+        painter.drawText(6, top + 12, f"{hi - margin:.1f}")
+        painter.drawText(6, height - 6, f"{lo + margin:.1f}")
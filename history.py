@@ -0,0 +1,347 @@
+import math
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, deque
+from gorilla import encode_block, decode_block
+
+
+# Min/max pyramid: level L aggregates LEVEL_FACTOR ** (L + 1) raw samples.
+LEVEL_FACTOR = 16
+LEVELS = 3
+LEVEL_SIZES = [LEVEL_FACTOR ** (level + 1) for level in range(LEVELS)]
+
+# Most recent events (e.g. throttle episodes) kept in memory
+MAX_EVENTS = 1000
+
+# Samples are trimmed from the front in whole top-level buckets so the
+# pyramid stays aligned to absolute sample indices.
+BLOCK = LEVEL_SIZES[-1]
+
+# Compressed backend: samples per sealed block, timestamp resolution
+# (seconds) and how many decoded blocks each metric keeps around
+SEAL_SAMPLES = 256
+TIME_RESOLUTION = 0.01
+DECODED_BLOCKS = 4
+
+
+def uncompressed_bytes(count):
+    """
+    What MetricHistory needs for `count` samples: two doubles per sample
+    plus a min and a max per pyramid bucket.
+    """
+    return 16 * count + sum(16 * (count // size + 1) for size in LEVEL_SIZES)
+
+
+class MetricHistory:
+    """
+    Timestamped history of one metric, bounded by a retention window.
+
+    Raw samples live in flat double arrays. Alongside them we keep a small
+    min/max pyramid that is updated in O(LEVELS) per append, so the min and
+    max of any index range can be answered without touching every sample.
+    """
+
+    def __init__(self):
+        self.times = array("d")
+        self.values = array("d")
+        # Absolute index of times[0]; always a multiple of BLOCK
+        self.start = 0
+        self.mins = [array("d") for _ in range(LEVELS)]
+        self.maxs = [array("d") for _ in range(LEVELS)]
+
+    def __len__(self):
+        return len(self.values)
+
+    def append(self, timestamp, value):
+        n = self.start + len(self.values)
+        self.times.append(timestamp)
+        self.values.append(value)
+        for level, size in enumerate(LEVEL_SIZES):
+            mins = self.mins[level]
+            maxs = self.maxs[level]
+            if n % size == 0:
+                mins.append(value)
+                maxs.append(value)
+            else:
+                if value < mins[-1]:
+                    mins[-1] = value
+                if value > maxs[-1]:
+                    maxs[-1] = value
+
+    def latest(self):
+        """
+        (timestamp, value) of the newest sample. Not valid when empty.
+        """
+        return self.times[-1], self.values[-1]
+
+    def tail(self, n):
+        return self.values[-n:]
+
+    def maybe_trim(self, cutoff):
+        # Only worth checking once a full block could be dropped
+        if len(self.values) >= 2 * BLOCK and self.times[BLOCK] < cutoff:
+            self.trim(cutoff)
+
+    def nbytes(self):
+        return (self.times.itemsize * len(self.times) + self.values.itemsize * len(self.values)
+                + sum(8 * (len(mins) + len(maxs)) for mins, maxs in zip(self.mins, self.maxs)))
+
+    def trim(self, cutoff):
+        """
+        Drop whole blocks of samples older than `cutoff`.
+        """
+        drop = (bisect_left(self.times, cutoff) // BLOCK) * BLOCK
+        if drop == 0:
+            return
+        del self.times[:drop]
+        del self.values[:drop]
+        for level, size in enumerate(LEVEL_SIZES):
+            del self.mins[level][:drop // size]
+            del self.maxs[level][:drop // size]
+        self.start += drop
+
+    def index(self, timestamp):
+        """
+        Relative index of the first sample at or after `timestamp`.
+        """
+        return bisect_left(self.times, timestamp)
+
+    def min_max(self, a, b):
+        """
+        Min and max of values[a:b] (relative indices), or None if empty.
+        """
+        if a >= b:
+            return None
+        return self._min_max(LEVELS - 1, self.start + a, self.start + b)
+
+    def _min_max(self, level, a, b):
+        # a and b are absolute sample indices
+        if level < 0:
+            chunk = self.values[a - self.start:b - self.start]
+            return min(chunk), max(chunk)
+        size = LEVEL_SIZES[level]
+        first = -(-a // size)
+        last = b // size
+        if first >= last:
+            return self._min_max(level - 1, a, b)
+        offset = self.start // size
+        lo = min(self.mins[level][first - offset:last - offset])
+        hi = max(self.maxs[level][first - offset:last - offset])
+        if a < first * size:
+            head = self._min_max(level - 1, a, first * size)
+            lo, hi = min(lo, head[0]), max(hi, head[1])
+        if last * size < b:
+            tail = self._min_max(level - 1, last * size, b)
+            lo, hi = min(lo, tail[0]), max(hi, tail[1])
+        return lo, hi
+
+
+class CompressedHistory:
+    """
+    Drop-in alternative to MetricHistory that keeps old samples
+    Gorilla-encoded (see gorilla.py).
+
+    New samples go into an open block of raw arrays. Every SEAL_SAMPLES
+    samples the block is sealed: encoded to bytes, with its first
+    timestamp, min and max kept alongside. Range queries answer fully
+    covered blocks from those summaries and decode only the blocks at the
+    edges of the range, through a small per-metric cache. Timestamps are
+    stored at TIME_RESOLUTION, so a steadily sampled metric whose value does
+    not change costs about two bits per sample.
+
+    Wide queries never decode: index() places a timestamp inside a block by
+    assuming its samples are evenly spaced (exact once the block is in the
+    cache), and min_max() takes ranges spanning three or more blocks from
+    the summaries alone, edges included.
+    """
+
+    def __init__(self):
+        self.blocks = []
+        self.block_starts = array("d")
+        self.block_mins = array("d")
+        self.block_maxs = array("d")
+        # Absolute number of blocks[0], so cache keys survive trimming
+        self.first_block = 0
+        self.open_times = array("d")
+        self.open_values = array("d")
+        self.decoded = OrderedDict()
+
+    def __len__(self):
+        return len(self.blocks) * SEAL_SAMPLES + len(self.open_values)
+
+    def append(self, timestamp, value):
+        self.open_times.append(timestamp)
+        self.open_values.append(value)
+        if len(self.open_values) == SEAL_SAMPLES:
+            self.seal()
+
+    def seal(self):
+        ticks = [round(t / TIME_RESOLUTION) for t in self.open_times]
+        self.blocks.append(encode_block(ticks, self.open_values))
+        self.block_starts.append(self.open_times[0])
+        self.block_mins.append(min(self.open_values))
+        self.block_maxs.append(max(self.open_values))
+        self.open_times = array("d")
+        self.open_values = array("d")
+
+    def block(self, i):
+        """
+        (times, values) arrays of sealed block i, decoding it if needed.
+        """
+        key = self.first_block + i
+        data = self.decoded.get(key)
+        if data is not None:
+            self.decoded.move_to_end(key)
+            return data
+        ticks, values = decode_block(self.blocks[i], SEAL_SAMPLES)
+        data = (array("d", [t * TIME_RESOLUTION for t in ticks]), array("d", values))
+        self.decoded[key] = data
+        if len(self.decoded) > DECODED_BLOCKS:
+            self.decoded.popitem(last=False)
+        return data
+
+    def latest(self):
+        if self.open_values:
+            return self.open_times[-1], self.open_values[-1]
+        times, values = self.block(len(self.blocks) - 1)
+        return times[-1], values[-1]
+
+    def tail(self, n):
+        values = list(self.open_values[-n:])
+        i = len(self.blocks) - 1
+        while len(values) < n and i >= 0:
+            values[:0] = self.block(i)[1][-(n - len(values)):]
+            i -= 1
+        return values
+
+    def maybe_trim(self, cutoff):
+        if len(self.blocks) > 1 and self.block_starts[1] <= cutoff:
+            self.trim(cutoff)
+
+    def trim(self, cutoff):
+        """
+        Drop sealed blocks that end before `cutoff`.
+        """
+        # Block i is entirely older than cutoff once block i + 1 starts by then
+        drop = max(0, bisect_right(self.block_starts, cutoff) - 1)
+        if drop == 0:
+            return
+        del self.blocks[:drop]
+        del self.block_starts[:drop]
+        del self.block_mins[:drop]
+        del self.block_maxs[:drop]
+        self.first_block += drop
+        for key in [k for k in self.decoded if k < self.first_block]:
+            del self.decoded[key]
+
+    def index(self, timestamp):
+        """
+        Relative index of the first sample at or after `timestamp`.
+        """
+        sealed = len(self.blocks) * SEAL_SAMPLES
+        if not self.blocks or (self.open_times and timestamp > self.open_times[0]):
+            return sealed + bisect_left(self.open_times, timestamp)
+        i = bisect_right(self.block_starts, timestamp) - 1
+        if i < 0:
+            return 0
+        data = self.decoded.get(self.first_block + i)
+        if data is not None:
+            return i * SEAL_SAMPLES + bisect_left(data[0], timestamp)
+        if i + 1 < len(self.blocks):
+            end = self.block_starts[i + 1]
+        elif self.open_times:
+            end = self.open_times[0]
+        else:
+            return i * SEAL_SAMPLES + bisect_left(self.block(i)[0], timestamp)
+        # Sample k of the block sits near start + k * (end - start) / SEAL_SAMPLES
+        start = self.block_starts[i]
+        j = math.ceil((timestamp - start) * SEAL_SAMPLES / (end - start))
+        return i * SEAL_SAMPLES + min(j, SEAL_SAMPLES)
+
+    def min_max(self, a, b):
+        """
+        Min and max of samples a..b-1 (relative indices), or None if empty.
+        """
+        b = min(b, len(self))
+        if a >= b:
+            return None
+        lo = hi = None
+
+        def merge(chunk_lo, chunk_hi):
+            nonlocal lo, hi
+            lo = chunk_lo if lo is None else min(lo, chunk_lo)
+            hi = chunk_hi if hi is None else max(hi, chunk_hi)
+
+        sealed = len(self.blocks) * SEAL_SAMPLES
+        if b > sealed:
+            chunk = self.open_values[max(a, sealed) - sealed:b - sealed]
+            merge(min(chunk), max(chunk))
+            b = sealed
+        if a >= b:
+            return lo, hi
+        first, last = a // SEAL_SAMPLES, (b - 1) // SEAL_SAMPLES
+        if last - first > 1:
+            # Wide range: a partial edge block is a small share of it, so its
+            # summary stands in rather than decoding it
+            merge(min(self.block_mins[first:last + 1]), max(self.block_maxs[first:last + 1]))
+            return lo, hi
+        # Only the (at most two) edge blocks are decoded
+        for i in (first, last) if first != last else (first,):
+            start = i * SEAL_SAMPLES
+            chunk = self.block(i)[1][max(a, start) - start:min(b, start + SEAL_SAMPLES) - start]
+            merge(min(chunk), max(chunk))
+        return lo, hi
+
+    def nbytes(self):
+        return (sum(sys.getsizeof(block) for block in self.blocks)
+                + 8 * (len(self.block_starts) + len(self.block_mins) + len(self.block_maxs))
+                + 8 * (len(self.open_times) + len(self.open_values))
+                + sum(8 * (len(times) + len(values)) for times, values in self.decoded.values()))
+
+
+class HistoryStore:
+    """
+    Per-metric MetricHistory (or CompressedHistory when `compressed`),
+    trimmed to `retention` seconds, plus a log of timestamped events (dicts
+    with at least "start" and "end").
+    """
+
+    def __init__(self, retention, compressed=False):
+        self.retention = retention
+        self.compressed = compressed
+        self.metrics = {}
+        self.events = deque(maxlen=MAX_EVENTS)
+
+    def series(self, key):
+        """
+        The MetricHistory for `key`, created if needed. Callers that append
+        every tick can keep it and use append_to() to skip the lookup.
+        """
+        history = self.metrics.get(key)
+        if history is None:
+            history = CompressedHistory() if self.compressed else MetricHistory()
+            self.metrics[key] = history
+        return history
+
+    def append(self, key, timestamp, value):
+        self.append_to(self.series(key), timestamp, value)
+
+    def append_to(self, history, timestamp, value):
+        history.append(timestamp, value)
+        history.maybe_trim(timestamp - self.retention)
+
+    def get(self, key):
+        return self.metrics.get(key)
+
+    def add_event(self, event):
+        self.events.append(event)
+
+    def memory_usage(self):
+        """
+        {metric: (samples, bytes used, bytes the uncompressed store would use)}.
+        """
+        return {
+            key: (len(history), history.nbytes(), uncompressed_bytes(len(history)))
+            for key, history in self.metrics.items()
+        }
@@ -1,21 +1,80 @@
 #!/usr/bin/env python3
 
 import sys
+
+# Terminal modes must not pull in Qt, so dispatch before the GUI imports
+if __name__ == "__main__" and any(arg in ("--tui", "--once") for arg in sys.argv[1:]):
+    from linfo_tui import main
+    sys.exit(main(sys.argv[1:]))
+
 import os
+import time
 import subprocess
 import psutil
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QWidget, QTableWidget, QTableWidgetItem,
-    QToolButton, QSystemTrayIcon, QMenu, QMenuBar, QMessageBox
+    QToolButton, QSystemTrayIcon, QMenu, QMenuBar, QMessageBox, QTabWidget, QSplitter
 )
 from PyQt6.QtCore import QTimer, Qt, QSettings
-from PyQt6.QtGui import QColor, QFont, QIcon, QAction, QCursor
+from PyQt6.QtGui import QColor, QFont, QIcon, QAction, QActionGroup, QCursor
 from sensors import sensor
+from processes import ProcessTable
+from cgroups import CgroupCollector
+from gpu_processes import GPUProcessCollector
+from graph_widget import HistoryGraph
+from subscriptions import Subscriptions
+from alerts import AlertEngine, LEVEL_COLORS, load_rules
 from install import resource_path
-from tray_icon import create_tray
+from tray_icon import create_tray, GRAPH_POINTS
 from settings_window import SettingsWindow
+from instrumentation_window import InstrumentationWindow
 from theme import get_stylesheet
 
+# Polling interval (ms) when no visible consumer needs fast data
+LOW_POWER_INTERVAL = 5000
+
+# Fixed columns of the Sensors table; percentile columns are appended after them
+SENSOR_COLUMNS = ["Metric", "Min", "Max", "Avg", "Current"]
+
+# (header, quantile) for the optional percentile columns
+PERCENTILE_COLUMNS = [
+    ("p50", 0.5),
+    ("p95", 0.95),
+    ("p99", 0.99),
+]
+
+# Number of rows shown in the Processes tab
+PROCESS_ROWS = 30
+
+# (header, sort key) for the Processes tab; None means not sortable
+PROCESS_COLUMNS = [
+    ("PID", None),
+    ("Name", None),
+    ("User", None),
+    ("CPU", "cpu"),
+    ("Memory", "memory"),
+    ("GPU", "gpu"),
+    ("GPU Memory", "gpu_memory"),
+]
+
+
+THROTTLE_COLUMNS = ["Start", "End", "Device", "Cause", "Clock Loss"]
+
+# Number of rows shown in the Containers tab
+CGROUP_ROWS = 30
+
+# (header, sort key) for the Containers tab; PSI columns are "some avg10"
+CGROUP_COLUMNS = [
+    ("Cgroup", None),
+    ("CPU", "cpu"),
+    ("Memory", "memory"),
+    ("IO Read", "io"),
+    ("IO Write", "io"),
+    ("CPU PSI", None),
+    ("Mem PSI", None),
+    ("IO PSI", None),
+]
+
 
 class LinfoApp(QMainWindow):
     def __init__(self):
@@ -33,6 +92,8 @@ class LinfoApp(QMainWindow):
             "CPU": self.settings.value("cpu_expanded", False, type=bool),
             "GPU": True,  # default expanded
             "RAM": True,
+            "Disk": True,
+            "Network": True,
         }
 
         # If not running as root, re-launch via pkexec
@@ -56,7 +117,19 @@ class LinfoApp(QMainWindow):
             os.execvp("pkexec", cmd)
 
         # Initialize hardware sensor backend
-        self.system_stats = sensor()
+        retention_hours = self.settings.value("history_retention_hours", 24, type=int)
+        self.system_stats = sensor(
+            history_retention=retention_hours * 3600,
+            history_compressed=self.settings.value("history_compressed", False, type=bool),
+        )
+
+        # Alert rules run in the sampling path, whether or not the window is shown
+        rules_path = os.path.join(os.path.dirname(self.settings.fileName()), "alerts.json")
+        self.alerts = AlertEngine(load_rules(rules_path), on_change=self.on_alert)
+        self.system_stats.attach_alerts(self.alerts)
+
+        # Metrics each consumer currently needs; only their union is sampled
+        self.demand = Subscriptions(normalize=self.system_stats.collector_key)
 
         # Menu Bar
         menu_bar = self.menuBar()
@@ -79,24 +152,97 @@ class LinfoApp(QMainWindow):
         toggle_cpu_action.setChecked(self.component_expanded["CPU"])
         toggle_cpu_action.toggled.connect(lambda checked: self.toggle_component("CPU", checked))
         view_menu.addAction(toggle_cpu_action)
+        reset_energy_action = QAction("Reset Energy Counters", self)
+        reset_energy_action.triggered.connect(self.system_stats.reset_energy)
+        view_menu.addAction(reset_energy_action)
+
+        # Percentile columns come from per-metric quantile sketches in sensor
+        self.percentile_columns = [
+            label for label in self.settings.value("percentile_columns", "").split(",")
+            if label in dict(PERCENTILE_COLUMNS)
+        ]
+        self.percentile_window = self.settings.value("percentile_window", False, type=bool)
+        percentile_menu = view_menu.addMenu("Percentile Columns")
+        for label, _ in PERCENTILE_COLUMNS:
+            action = QAction(label, self, checkable=True)
+            action.setChecked(label in self.percentile_columns)
+            action.toggled.connect(lambda checked, label=label: self.toggle_percentile(label, checked))
+            percentile_menu.addAction(action)
+        percentile_menu.addSeparator()
+        window_group = QActionGroup(self)
+        for text, window in (("Over Session", False), ("Over Last 5 Minutes", True)):
+            action = QAction(text, self, checkable=True)
+            action.setChecked(window == self.percentile_window)
+            action.triggered.connect(lambda checked, window=window: self.set_percentile_window(window))
+            window_group.addAction(action)
+            percentile_menu.addAction(action)
 
         # Help Menu
         help_menu = menu_bar.addMenu("Help")
         about_action = QAction("About", self)
         about_action.triggered.connect(self.show_about)
         help_menu.addAction(about_action)
+        instrumentation_action = QAction("Instrumentation", self)
+        instrumentation_action.triggered.connect(self.open_instrumentation)
+        help_menu.addAction(instrumentation_action)
 
         # Set up main layout
         layout = QVBoxLayout()
         self.table = QTableWidget()
         self.table.verticalHeader().setVisible(False)
-        self.table.setColumnCount(5)
+        self.update_table_columns()
         self.table.setColumnWidth(0, 200)
-        self.table.setHorizontalHeaderLabels(["Metric", "Min", "Max", "Avg", "Current"])
         table_width = sum([self.table.columnWidth(i) for i in range(self.table.columnCount())])
-        self.setGeometry(100, 100, table_width + 60, 500)  # add padding for borders/scroll
-
-        layout.addWidget(self.table)
+        self.setGeometry(100, 100, table_width + 60, 650)  # add padding for borders/scroll
+
+        # Metric key for each table row (None for group rows), used to pick the graphed metric
+        self.row_keys = []
+        self.table.cellClicked.connect(self.select_graph_metric)
+
+        # History graph for the selected row
+        self.graph = HistoryGraph(self.system_stats.history, self.get_unit_for_key)
+        self.sensor_splitter = QSplitter(Qt.Orientation.Vertical)
+        self.sensor_splitter.addWidget(self.table)
+        self.sensor_splitter.addWidget(self.graph)
+        self.sensor_splitter.setSizes([400, 200])
+
+        # Processes tab
+        self.processes = ProcessTable()
+        self.gpu_processes = GPUProcessCollector()
+        self.process_sort = "cpu"
+        self.process_table = QTableWidget()
+        self.process_table.verticalHeader().setVisible(False)
+        self.process_table.setColumnCount(len(PROCESS_COLUMNS))
+        self.process_table.setColumnWidth(1, 200)
+        self.process_table.setHorizontalHeaderLabels([label for label, _ in PROCESS_COLUMNS])
+        self.process_table.horizontalHeader().sectionClicked.connect(self.sort_processes)
+
+        # Containers tab (cgroup v2)
+        self.cgroups = CgroupCollector()
+        self.cgroup_sort = "cpu"
+        self.cgroup_table = QTableWidget()
+        self.cgroup_table.verticalHeader().setVisible(False)
+        self.cgroup_table.setColumnCount(len(CGROUP_COLUMNS))
+        self.cgroup_table.setColumnWidth(0, 320)
+        self.cgroup_table.setHorizontalHeaderLabels([label for label, _ in CGROUP_COLUMNS])
+        self.cgroup_table.horizontalHeader().sectionClicked.connect(self.sort_cgroups)
+
+        # Throttling tab
+        self.throttle_table = QTableWidget()
+        self.throttle_table.verticalHeader().setVisible(False)
+        self.throttle_table.setColumnCount(len(THROTTLE_COLUMNS))
+        self.throttle_table.setColumnWidth(3, 220)
+        self.throttle_table.setHorizontalHeaderLabels(THROTTLE_COLUMNS)
+        self.throttle_shown = None
+
+        self.tabs = QTabWidget()
+        self.tabs.addTab(self.sensor_splitter, "Sensors")
+        self.tabs.addTab(self.process_table, "Processes")
+        if self.cgroups.available:
+            self.tabs.addTab(self.cgroup_table, "Containers")
+        self.tabs.addTab(self.throttle_table, "Throttling")
+        self.tabs.currentChanged.connect(self.on_tab_changed)
+        layout.addWidget(self.tabs)
 
         container = QWidget()
         container.setLayout(layout)
@@ -107,18 +253,20 @@ class LinfoApp(QMainWindow):
         self.timer.timeout.connect(self.update_stats)
 
         # Set Up Polling Interval
-        interval = self.settings.value("polling_interval", 1000, type=int)
-        self.timer.start(interval)
+        self.polling_interval = self.settings.value("polling_interval", 1000, type=int)
+        self.timer.start(self.polling_interval)
 
         self.tray = create_tray(self, resource_path("icon.svg"))
+        self.tray_metric = self.settings.value("tray_metric", "None")
+        self.tray_style = self.settings.value("tray_style", "number")
+        self.per_core_expanded = self.settings.value("cpu_expanded", False, type=bool)
 
         # Set up Setting window
         if self.settings.value("start_minimized", True, type=bool):
             self.hide()
         else:
             self.show()
-
-        self.per_core_expanded = self.settings.value("cpu_expanded", False, type=bool)
+        self.refresh_demand()
 
     def restore_from_tray(self):
         self.showNormal()
@@ -129,12 +277,24 @@ class LinfoApp(QMainWindow):
         self.settings_window.show()
         self.settings_window.destroyed.connect(self.apply_settings)  # when closed
 
+    def open_instrumentation(self):
+        self.instrumentation_window = InstrumentationWindow(self.system_stats.history)
+        self.instrumentation_window.show()
+
     def apply_settings(self):
         self.cpu_expanded = self.settings.value("cpu_expanded", False, type=bool)
-        interval = self.settings.value("polling_interval", 1000, type=int)
-        self.timer.setInterval(interval)
+        self.polling_interval = self.settings.value("polling_interval", 1000, type=int)
         theme = self.settings.value("theme", "dark")
         self.setStyleSheet(get_stylesheet(theme))
+        retention_hours = self.settings.value("history_retention_hours", 24, type=int)
+        self.system_stats.history.retention = retention_hours * 3600
+        self.graph.update()
+        self.tray_metric = self.settings.value("tray_metric", "None")
+        self.tray_style = self.settings.value("tray_style", "number")
+        self.tray.renderer.reset()
+        if self.tray_metric == "None":
+            self.tray.set_static_icon()
+        self.refresh_demand()
 
     def quit_app(self):
         QApplication.instance().quit()
@@ -142,6 +302,81 @@ class LinfoApp(QMainWindow):
     def show_about(self):
         QMessageBox.information(self, "About Linfo", "Linfo\nVersion 1.0\n\nSystem Hardware Monitor GUI built with PyQt6.")
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh_demand()
+        # Data for the table may be stale after a stretch in the tray
+        QTimer.singleShot(0, self.update_stats)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.refresh_demand()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == event.Type.WindowStateChange:
+            self.refresh_demand()
+
+    def on_tab_changed(self, index):
+        self.refresh_demand()
+        self.update_processes()
+        self.update_cgroups()
+        self.update_throttle_table()
+
+    def refresh_demand(self):
+        """
+        Re-subscribe each on-screen consumer and pick the polling cadence.
+        Hidden or collapsed parts of the UI subscribe to nothing.
+        """
+        on_screen = self.isVisible() and not self.isMinimized()
+
+        if on_screen and self.table.isVisible():
+            metrics = []
+            for component, keys in self.build_component_map().items():
+                if self.component_expanded.get(component, True):
+                    # The component name covers per-device rows not seen yet
+                    metrics.append(component)
+                    metrics.extend(keys)
+            self.demand.subscribe("table", metrics)
+        else:
+            self.demand.unsubscribe("table")
+
+        if on_screen and self.graph.isVisible() and self.graph.metric:
+            self.demand.subscribe("graph", [self.graph.metric])
+        else:
+            self.demand.unsubscribe("graph")
+
+        # The other tabs refresh every tick while on screen. Their pseudo-keys
+        # only keep the fast cadence; sensor.update_all has no collector for them.
+        tabs = [("processes", self.process_table, "Processes"),
+                ("containers", self.cgroup_table, "Containers"),
+                ("throttle_tab", self.throttle_table, "Throttling")]
+        for consumer, widget, key in tabs:
+            if on_screen and self.tabs.currentWidget() is widget:
+                self.demand.subscribe(consumer, [key])
+            else:
+                self.demand.unsubscribe(consumer)
+
+        # The tray icon is always shown but is fine at the low-power cadence
+        if self.tray_metric != "None":
+            self.demand.subscribe("tray", [self.tray_metric], fast=False)
+        else:
+            self.demand.unsubscribe("tray")
+
+        # Alert rules keep their metrics sampled even in the tray
+        self.demand.subscribe("alerts", self.alerts.metrics(), fast=False)
+
+        # Throttle episodes are recorded all the time so none are missed
+        self.demand.subscribe("throttle", ["Throttling"], fast=False)
+
+        # RAPL counters wrap; sampling them in the tray too keeps the session energy whole
+        if self.system_stats.rapl.available:
+            self.demand.subscribe("energy", ["CPU Power"], fast=False)
+
+        interval = self.polling_interval if self.demand.fast() else max(self.polling_interval, LOW_POWER_INTERVAL)
+        if self.timer.interval() != interval:
+            self.timer.setInterval(interval)
+
     def closeEvent(self, event):
         """Minimize to tray on window close"""
         event.ignore()
@@ -149,12 +384,7 @@ class LinfoApp(QMainWindow):
 
     def get_unit_for_key(self, key):
         # Returns the unit string for a given stat key
-        if key.startswith("Core "):
-            return "MHz"
-        # This is hacky, but it works for now
-        if "RPM" in key:
-            return "RPM"
-        return self.system_stats.units.get(key, "")
+        return self.system_stats.unit_for(key)
 
     def get_colored_item(self, key, value, unit):
         # Returns a table item with unit, bold font, color-coded if needed
@@ -165,61 +395,166 @@ class LinfoApp(QMainWindow):
         item.setFont(font)
         item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
 
-        # Threshold-based color coding
-        if key == "CPU Temperature" and isinstance(value, (int, float)):
-            if value > 80:
-                item.setForeground(QColor("red"))
-            elif value > 60:
-                item.setForeground(QColor("orange"))
-        elif key == "GPU Temperature" and isinstance(value, (int, float)):
-            if value > 85:
-                item.setForeground(QColor("red"))
-            elif value > 70:
-                item.setForeground(QColor("orange"))
-        elif key == "CPU Usage" and isinstance(value, (int, float)):
-            if value > 90:
-                item.setForeground(QColor("red"))
-            elif value > 70:
-                item.setForeground(QColor("orange"))
-        elif key == "GPU Power" and isinstance(value, (int, float)):
-            if value > 110:
-                item.setForeground(QColor("red"))
-            elif value > 90:
-                item.setForeground(QColor("orange"))
+        # Colour comes from the alert rules' current state
+        level = self.alerts.level(key)
+        if level is not None:
+            item.setForeground(QColor(LEVEL_COLORS[level]))
         return item
 
-    def update_stats(self):
-        self.system_stats.update_all()
-
-        # Build component map
-        component_map = {
-            "CPU": [
-                "CPU Usage",
-                "CPU Frequency",
-                "CPU Temperature",
-                *[k for k in self.system_stats.stats if k.startswith("Core ")]
-            ],
-            "GPU": [
-                "GPU Temperature",
-                "GPU Core Frequency",
-                "GPU Power",
-                "GPU Memory",
-                "GPU Memory Frequency",
-                "GPU Memory Usage",
-                "GPU Fan Speed",
-                *sorted(
-                    [k for k in self.system_stats.stats if k.startswith("GPU Fan Speed RPM ")],
-                    key=lambda x: int(x.split()[-1])
-                ),
-                "GPU Throttle Temperature",
-            ],
-            "RAM": [
-                "RAM Usage",
-                "RAM Frequency"
+    def on_alert(self, rule, active, value):
+        if active and rule.notify:
+            self.tray.notify("Linfo alert", rule.describe(value), critical=rule.level == "critical")
+
+    def update_tray(self):
+        renderer = self.tray.renderer
+        level = self.alerts.highest_level()
+        had_badge = renderer.badge is not None
+        renderer.set_badge(LEVEL_COLORS[level] if level else None)
+        if self.tray_metric == "None":
+            if level:
+                self.tray.set_live_icon(renderer.render_static(self.tray.icon_path), "Linfo: alert active")
+            elif had_badge:
+                self.tray.set_static_icon()
+            return
+        values = self.system_stats.stats.get(self.tray_metric)
+        if not values:
+            return
+        if self.tray_style == "graph":
+            # self.stats is not kept in time order; the history is
+            rendered = renderer.render_graph(self.system_stats.history.get(self.tray_metric).tail(GRAPH_POINTS))
+        else:
+            rendered = renderer.render_number(values[-1])
+        if rendered is not None:
+            unit = self.get_unit_for_key(self.tray_metric)
+            self.tray.set_live_icon(rendered, f"{self.tray_metric}: {values[-1]:g} {unit}")
+
+    def select_graph_metric(self, row, column):
+        if row < len(self.row_keys) and self.row_keys[row] is not None:
+            self.graph.set_metric(self.row_keys[row])
+            self.refresh_demand()
+
+    def sort_processes(self, column):
+        sort_key = PROCESS_COLUMNS[column][1]
+        if sort_key is not None:
+            self.process_sort = sort_key
+            self.update_processes()
+
+    def update_processes(self):
+        # Scanning every PID is only worth it while the tab is on screen
+        if not self.isVisible() or self.tabs.currentWidget() is not self.process_table:
+            self.gpu_processes.close()
+            return
+        self.processes.update()
+        if self.system_stats.gpu_backend == "nvidia":
+            self.processes.join_gpu(self.gpu_processes.collect())
+        top = self.processes.top(PROCESS_ROWS, self.process_sort)
+
+        rows = [
+            [
+                str(proc.pid),
+                proc.name,
+                proc.username,
+                f"{proc.cpu:.1f} %",
+                f"{proc.rss // (1024 * 1024)} MiB",
+                f"{proc.gpu_util} %" if proc.pid in self.processes.gpu_pids else "",
+                f"{proc.gpu_mem} MiB" if proc.pid in self.processes.gpu_pids else "",
             ]
-        }
+            for proc in top
+        ]
+        self.fill_table(self.process_table, rows, right_aligned=lambda col: col == 0 or col >= 3)
+
+    def fill_table(self, table, rows, right_aligned):
+        # Reuses existing items so a refresh only changes text
+        table.setRowCount(len(rows))
+        for row, cells in enumerate(rows):
+            for col, text in enumerate(cells):
+                item = table.item(row, col)
+                if item is None:
+                    item = QTableWidgetItem()
+                    if right_aligned(col):
+                        item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                    table.setItem(row, col, item)
+                item.setText(text)
+
+    def sort_cgroups(self, column):
+        sort_key = CGROUP_COLUMNS[column][1]
+        if sort_key is not None:
+            self.cgroup_sort = sort_key
+            self.update_cgroups()
+
+    def update_cgroups(self):
+        # Same rule as processes: only scan while the tab is on screen
+        if not self.isVisible() or self.tabs.currentWidget() is not self.cgroup_table:
+            return
+        self.cgroups.update()
+
+        def psi(value):
+            return "" if value is None else f"{value:.1f} %"
+
+        rows = [
+            [
+                group.name,
+                f"{group.cpu:.1f} %",
+                f"{group.memory // (1024 * 1024)} MiB",
+                f"{group.read:.1f} MB/s",
+                f"{group.write:.1f} MB/s",
+                *[psi(value) for value in group.pressure],
+            ]
+            for group in self.cgroups.top(CGROUP_ROWS, self.cgroup_sort)
+        ]
+        self.fill_table(self.cgroup_table, rows, right_aligned=lambda col: col >= 1)
+
+    def update_throttle_table(self):
+        if not self.throttle_table.isVisible():
+            return
+        events = self.system_stats.history.events
+        ongoing = self.system_stats.throttle.ongoing()
+        # Finished episodes never change, so only redraw when something moved
+        state = (len(events), events[-1]["end"] if events else None, [e["end"] for e in ongoing])
+        if state == self.throttle_shown:
+            return
+        self.throttle_shown = state
+
+        def fmt(ts):
+            return time.strftime("%H:%M:%S", time.localtime(ts))
+
+        rows = [(e, True) for e in reversed(ongoing)] + [(e, False) for e in reversed(events)]
+        self.throttle_table.setRowCount(len(rows))
+        for row, (event, is_ongoing) in enumerate(rows):
+            cells = [
+                fmt(event["start"]),
+                "ongoing" if is_ongoing else fmt(event["end"]),
+                event["source"],
+                event["cause"],
+                f"{event['clock_loss_mhz']} MHz ({event['clock_loss_pct']} %)",
+            ]
+            for col, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if is_ongoing:
+                    item.setForeground(QColor("orange"))
+                self.throttle_table.setItem(row, col, item)
+
+    def update_stats(self):
+        wanted = self.demand.wanted()
+        if wanted:
+            self.system_stats.update_all(wanted)
+        self.update_processes()
+        self.update_cgroups()
+        self.update_throttle_table()
+        self.update_tray()
+        if self.graph.isVisible():
+            self.graph.update()
+        if self.table.isVisible():
+            self.render_table()
+
+    def build_component_map(self):
+        return self.system_stats.component_map()
+
+    def render_table(self):
+        component_map = self.build_component_map()
 
         self.table.setRowCount(0)
+        self.row_keys = []
         row = 0
 
         for component, keys in component_map.items():
@@ -241,6 +576,7 @@ class LinfoApp(QMainWindow):
 
             self.table.insertRow(row)
             self.table.setCellWidget(row, 0, toggle_btn)
+            self.row_keys.append(None)
             row += 1
 
             if not expanded:
@@ -256,6 +592,7 @@ class LinfoApp(QMainWindow):
                 # Handle CPU Frequency with per-core expansion separately.
                 if component == "CPU" and key == "CPU Frequency":
                     self.table.insertRow(row)
+                    self.row_keys.append(key)
                     freq_toggle = QToolButton()
                     freq_toggle.setText("CPU Frequency")
                     freq_toggle.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextBesideIcon)
@@ -269,20 +606,24 @@ class LinfoApp(QMainWindow):
                         item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
                         self.table.setItem(row, col, item)
                     self.table.setItem(row, 4, self.get_colored_item(key, values[-1], unit))
+                    self.set_percentile_items(row, key, unit)
                     row += 1
 
                     if self.per_core_expanded:
-                        for core_key in sorted([k for k in keys if k.startswith("Core ")], key=lambda x: int(x.split()[1])):
+                        # The registry layout already lists cores in index order
+                        for core_key in [self.system_stats.registry[i].name for i in self.system_stats.core_ids]:
                             core_values = self.system_stats.stats[core_key]
                             if not core_values:
                                 continue
                             self.table.insertRow(row)
+                            self.row_keys.append(core_key)
                             self.table.setItem(row, 0, QTableWidgetItem(core_key))
                             for col, val in zip(range(1, 4), [min(core_values), max(core_values), int(sum(core_values) / len(core_values))]):
                                 item = QTableWidgetItem(f"{val} MHz")
                                 item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
                                 self.table.setItem(row, col, item)
                             self.table.setItem(row, 4, self.get_colored_item(core_key, core_values[-1], "MHz"))
+                            self.set_percentile_items(row, core_key, "MHz")
                             row += 1
                     continue  # Skip re-processing CPU Frequency and its cores.
 
@@ -290,6 +631,7 @@ class LinfoApp(QMainWindow):
                     continue  # Already handled above.
 
                 self.table.insertRow(row)
+                self.row_keys.append(key)
                 self.table.setItem(row, 0, QTableWidgetItem(key))
                 unit = self.get_unit_for_key(key)
                 for col, val in zip(range(1, 4), [min(values), max(values), int(sum(values) / len(values))]):
@@ -297,10 +639,44 @@ class LinfoApp(QMainWindow):
                     item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
                     self.table.setItem(row, col, item)
                 self.table.setItem(row, 4, self.get_colored_item(key, values[-1], unit))
+                self.set_percentile_items(row, key, unit)
                 row += 1
 
+    def update_table_columns(self):
+        labels = SENSOR_COLUMNS + [label for label, _ in PERCENTILE_COLUMNS if label in self.percentile_columns]
+        self.table.setColumnCount(len(labels))
+        self.table.setHorizontalHeaderLabels(labels)
+
+    def toggle_percentile(self, label, checked):
+        if checked and label not in self.percentile_columns:
+            self.percentile_columns.append(label)
+        elif not checked and label in self.percentile_columns:
+            self.percentile_columns.remove(label)
+        self.settings.setValue("percentile_columns", ",".join(self.percentile_columns))
+        self.update_table_columns()
+        if self.table.isVisible():
+            self.render_table()
+
+    def set_percentile_window(self, window):
+        self.percentile_window = window
+        self.settings.setValue("percentile_window", window)
+        if self.table.isVisible():
+            self.render_table()
+
+    def set_percentile_items(self, row, key, unit):
+        # Fills the enabled percentile columns after "Current"
+        quantiles = [q for label, q in PERCENTILE_COLUMNS if label in self.percentile_columns]
+        if not quantiles:
+            return
+        values = self.system_stats.percentiles(key, quantiles, window=self.percentile_window)
+        for col, val in enumerate(values, start=len(SENSOR_COLUMNS)):
+            item = QTableWidgetItem("" if val is None else f"{round(val, 1)} {unit}")
+            item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            self.table.setItem(row, col, item)
+
     def toggle_component(self, component, checked):
         self.component_expanded[component] = checked
+        self.refresh_demand()
         self.update_stats()
 
     def toggle_per_core(self, checked):
@@ -0,0 +1,78 @@
+# instrumentation_window.py
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QIcon
+from install import resource_path
+
+COLUMNS = ["Metric", "Samples", "Memory", "Bytes/Sample", "Uncompressed"]
+
+
+def format_bytes(n):
+    for unit in ("B", "KiB", "MiB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GiB"
+
+
+class InstrumentationWindow(QWidget):
+    """
+    Linfo's own footprint: memory held by the metric history, per metric,
+    against what the uncompressed backend would need for the same samples.
+    """
+
+    def __init__(self, history):
+        super().__init__()
+        self.history = history
+        self.setWindowTitle("Instrumentation")
+        self.setWindowIcon(QIcon(resource_path("icon.svg")))
+        self.resize(560, 420)
+        layout = QVBoxLayout()
+
+        self.summary = QLabel()
+        layout.addWidget(self.summary)
+
+        self.table = QTableWidget()
+        self.table.verticalHeader().setVisible(False)
+        self.table.setColumnCount(len(COLUMNS))
+        self.table.setColumnWidth(0, 200)
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        layout.addWidget(self.table)
+
+        self.setLayout(layout)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(2000)
+        self.refresh()
+
+    def refresh(self):
+        if not self.isVisible() and self.table.rowCount():
+            return
+        usage = self.history.memory_usage()
+        samples = sum(count for count, _, _ in usage.values())
+        used = sum(nbytes for _, nbytes, _ in usage.values())
+        raw = sum(raw_bytes for _, _, raw_bytes in usage.values())
+        backend = "compressed (delta-of-delta / XOR)" if self.history.compressed else "uncompressed"
+        saved = f", {100 * (1 - used / raw):.0f} % saved" if raw and self.history.compressed else ""
+        self.summary.setText(
+            f"History backend: {backend}\n"
+            f"{len(usage)} metrics, {samples} samples\n"
+            f"{format_bytes(used)} in use, {format_bytes(raw)} uncompressed{saved}"
+        )
+
+        rows = sorted(usage.items(), key=lambda item: item[1][1], reverse=True)
+        self.table.setRowCount(len(rows))
+        for row, (key, (count, nbytes, raw_bytes)) in enumerate(rows):
+            cells = [
+                key,
+                str(count),
+                format_bytes(nbytes),
+                f"{nbytes / count:.2f}" if count else "",
+                format_bytes(raw_bytes),
+            ]
+            for col, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if col:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, col, item)
@@ -0,0 +1,117 @@
+import os
+
+
+# Pseudo block devices and per-container interfaces that only add noise
+DISK_IGNORE_PREFIXES = ("loop", "ram", "fd")
+NET_IGNORE = (b"lo",)
+NET_IGNORE_PREFIXES = (b"veth", b"cali", b"vnet", b"tap", b"flannel", b"cni")
+
+SECTOR_BYTES = 512
+
+
+def counter_delta(current, previous):
+    """
+    Difference between two readings of a monotonic kernel counter, or None
+    if it went backwards. The /proc/diskstats and /proc/net/dev counters
+    are 64-bit on current kernels, so a drop means the device was reset or
+    recreated (e.g. a VPN tun reconnecting), not a wrap.
+    """
+    if current < previous:
+        return None
+    return current - previous
+
+
+class IOStats:
+    """
+    Disk and network throughput from /proc/diskstats and /proc/net/dev.
+
+    Each file is read once per tick into a reused buffer and parsed for all
+    devices in one pass. Rates come from counter deltas against the previous
+    tick. Partitions are skipped (their parent disk already counts them), as
+    are loop/ram devices and veth-style interfaces.
+
+    `device_ids(kind, name)` is called once per new device ("disk" or
+    "net") and its result is what the rates are reported under, e.g. the
+    metric IDs of the device. By default that is the device name.
+    """
+
+    def __init__(self, reader, proc_root="/proc", block_root="/sys/block", device_ids=None):
+        self.reader = reader
+        self.device_ids = device_ids or (lambda kind, name: name)
+        self.diskstats_path = os.path.join(proc_root, "diskstats")
+        self.netdev_path = os.path.join(proc_root, "net", "dev")
+        self.block_root = block_root
+        self.buffers = {
+            self.diskstats_path: bytearray(16384),
+            self.netdev_path: bytearray(16384),
+        }
+        # name -> True for whole disks we report, False for skipped names
+        self.disk_filter = {}
+        # (kind, name bytes) -> [timestamp, counter, counter, device ids]
+        self.previous = {}
+
+    def _lines(self, path):
+        buf = self.buffers[path]
+        n = self.reader.read_into(path, buf)
+        if not n:
+            return []
+        with memoryview(buf) as view:
+            return bytes(view[:n]).splitlines()
+
+    def _want_disk(self, name):
+        keep = self.disk_filter.get(name)
+        if keep is None:
+            text = name.decode(errors="replace")
+            keep = (not text.startswith(DISK_IGNORE_PREFIXES)
+                    and os.path.exists(os.path.join(self.block_root, text.replace("/", "!"))))
+            self.disk_filter[name] = keep
+        return keep
+
+    def _rates(self, kind, name, now, a, b, scale, rates):
+        key = (kind, name)
+        previous = self.previous.get(key)
+        if previous is None:
+            ids = self.device_ids(kind, name.decode(errors="replace"))
+            self.previous[key] = [now, a, b, ids]
+            return
+        last, last_a, last_b, ids = previous
+        previous[0:3] = now, a, b
+        if now <= last:
+            return
+        dt = now - last
+        delta_a = counter_delta(a, last_a)
+        delta_b = counter_delta(b, last_b)
+        # After a reset the new readings are only a baseline; skip this tick
+        if delta_a is None or delta_b is None:
+            return
+        rates.append((ids, (round(delta_a * scale / dt, 1), round(delta_b * scale / dt, 1))))
+
+    def disk_rates(self, now):
+        """
+        [(device ids, (read MB/s, write MB/s))] for every whole disk.
+        """
+        rates = []
+        scale = SECTOR_BYTES / 1e6
+        for line in self._lines(self.diskstats_path):
+            fields = line.split()
+            # major minor name reads merged sectors_read ms writes merged sectors_written ...
+            if len(fields) < 10 or not self._want_disk(fields[2]):
+                continue
+            self._rates("disk", fields[2], now, int(fields[5]), int(fields[9]), scale, rates)
+        return rates
+
+    def net_rates(self, now):
+        """
+        [(device ids, (rx KB/s, tx KB/s))], skipping loopback and veth noise.
+        """
+        rates = []
+        for line in self._lines(self.netdev_path)[2:]:
+            name, _, counters = line.partition(b":")
+            name = name.strip()
+            if name in NET_IGNORE or name.startswith(NET_IGNORE_PREFIXES):
+                continue
+            fields = counters.split()
+            if len(fields) < 9:
+                continue
+            self._rates("net", name, now, int(fields[0]), int(fields[8]), 1 / 1e3, rates)
+        return rates
@@ -0,0 +1,211 @@
+# Terminal front end for Linfo. Reuses sensors.sensor and never imports PyQt,
+# so it starts quickly and stays small on headless servers.
+#
+#     hwtop.py --tui              live curses view
+#     hwtop.py --once --json      print one snapshot as JSON and exit
+
+import argparse
+import json
+import os
+import sys
+import time
+from sensors import sensor
+from alerts import AlertEngine, load_rules, default_rules_path
+
+
+def collect_keys(system_stats):
+    # Everything the table would show; RAM Frequency needs root for dmidecode
+    wanted = set()
+    for component, keys in system_stats.component_map().items():
+        # The component name covers per-device rows not seen yet
+        wanted.add(system_stats.collector_key(component))
+        wanted.update(system_stats.collector_key(key) for key in keys)
+    if os.geteuid() != 0:
+        wanted.discard("RAM Frequency")
+    # The session energy total must see every RAPL counter wrap, whatever is shown
+    wanted.add("CPU Power")
+    return wanted
+
+
+def format_value(value, unit):
+    if isinstance(value, float) and not value.is_integer():
+        return f"{value:.1f} {unit}".strip()
+    return f"{int(value)} {unit}".strip()
+
+
+def snapshot(system_stats):
+    """
+    Latest value of every collected metric, grouped by component.
+    """
+    components = {}
+    for component, keys in system_stats.component_map().items():
+        metrics = {}
+        for key in keys:
+            values = system_stats.stats.get(key)
+            if values:
+                metrics[key] = {"value": values[-1], "unit": system_stats.unit_for(key)}
+        components[component] = {
+            "name": system_stats.component_names.get(component, component),
+            "metrics": metrics,
+        }
+    return {
+        "timestamp": system_stats.now,
+        "components": components,
+        "throttle_events": list(system_stats.history.events) + system_stats.throttle.ongoing(),
+    }
+
+
+def run_once(as_json):
+    # Nothing here draws graphs, so keep no metric history
+    system_stats = sensor(history_retention=0)
+    wanted = collect_keys(system_stats)
+    # CPU usage and throughput rates are deltas, so take a baseline sample first
+    system_stats.update_all(wanted)
+    time.sleep(0.25)
+    system_stats.update_all(wanted)
+    snap = snapshot(system_stats)
+    if as_json:
+        json.dump(snap, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return 0
+    for component, info in snap["components"].items():
+        print(f"{info['name']} ({component})")
+        for key, metric in info["metrics"].items():
+            print(f"  {key:<28} {format_value(metric['value'], metric['unit']):>12}")
+    return 0
+
+
+class TerminalView:
+    """
+    curses renderer. Each screen line is remembered and only lines whose
+    text or colour changed are redrawn, so an idle tick writes almost
+    nothing to the terminal.
+    """
+
+    HEADER = f"{'Metric':<28}{'Min':>12}{'Max':>12}{'Avg':>12}{'Current':>12}"
+
+    def __init__(self, stdscr, interval):
+        import curses
+        self.curses = curses
+        self.stdscr = stdscr
+        self.interval = interval
+        self.per_core = False
+        self.lines = {}
+        # The table only needs Min/Max/Avg, never the graph history
+        self.system_stats = sensor(history_retention=0)
+        self.alerts = AlertEngine(load_rules(default_rules_path()))
+        self.system_stats.attach_alerts(self.alerts)
+        self.wanted = collect_keys(self.system_stats) | set(self.alerts.metrics()) | {"Throttling"}
+
+        curses.curs_set(0)
+        stdscr.nodelay(True)
+        self.colors = {None: 0, "heading": curses.A_BOLD}
+        if curses.has_colors():
+            curses.use_default_colors()
+            curses.init_pair(1, curses.COLOR_YELLOW, -1)
+            curses.init_pair(2, curses.COLOR_RED, -1)
+            curses.init_pair(3, curses.COLOR_CYAN, -1)
+            self.colors = {
+                None: 0,
+                "warning": curses.color_pair(1),
+                "critical": curses.color_pair(2),
+                "heading": curses.color_pair(3) | curses.A_BOLD,
+            }
+
+    def put(self, row, text, attr=0):
+        height, width = self.stdscr.getmaxyx()
+        if row >= height - 1:
+            return
+        text = text[:width - 1].ljust(width - 1)
+        if self.lines.get(row) == (text, attr):
+            return
+        self.lines[row] = (text, attr)
+        self.stdscr.addstr(row, 0, text, attr)
+
+    def build_rows(self):
+        stats = self.system_stats
+        rows = [(f"Linfo  {time.strftime('%H:%M:%S')}  every {self.interval:g}s   "
+                 f"q quit  c per-core  +/- interval", self.curses.A_BOLD),
+                ("", 0), (self.HEADER, self.curses.A_UNDERLINE)]
+        for component, keys in stats.component_map().items():
+            name = stats.component_names.get(component, component)
+            rows.append((f"{name} ({component})", self.colors["heading"]))
+            for key in keys:
+                if key.startswith("Core ") and not self.per_core:
+                    continue
+                values = stats.stats.get(key)
+                if not values:
+                    continue
+                unit = stats.unit_for(key)
+                label = f"  {key}" if key.startswith("Core ") else key
+                text = (f"{label:<28}"
+                        f"{format_value(min(values), unit):>12}"
+                        f"{format_value(max(values), unit):>12}"
+                        f"{format_value(sum(values) / len(values), unit):>12}"
+                        f"{format_value(values[-1], unit):>12}")
+                rows.append((text, self.colors.get(self.alerts.level(key), 0)))
+        events = list(stats.history.events)[-5:] + stats.throttle.ongoing()
+        if events:
+            rows.append(("", 0))
+            rows.append(("Throttling", self.colors["heading"]))
+            for event in reversed(events):
+                start = time.strftime("%H:%M:%S", time.localtime(event["start"]))
+                rows.append((f"  {start}  {event['source']:<4} {event['cause']:<30} "
+                             f"-{event['clock_loss_mhz']} MHz", 0))
+        return rows
+
+    def draw(self):
+        rows = self.build_rows()
+        for row, (text, attr) in enumerate(rows):
+            self.put(row, text, attr)
+        # Blank out lines left over from a longer previous frame
+        for row in [r for r in self.lines if r >= len(rows)]:
+            self.put(row, "")
+            del self.lines[row]
+        self.stdscr.noutrefresh()
+        self.curses.doupdate()
+
+    def run(self):
+        curses = self.curses
+        next_tick = 0.0
+        while True:
+            now = time.monotonic()
+            if now >= next_tick:
+                self.system_stats.update_all(self.wanted)
+                self.draw()
+                next_tick = now + self.interval
+            key = self.stdscr.getch()
+            if key in (ord("q"), ord("Q")):
+                return 0
+            if key == ord("c"):
+                self.per_core = not self.per_core
+                next_tick = 0.0
+            elif key in (ord("+"), ord("=")):
+                self.interval = min(10.0, self.interval * 2)
+            elif key == ord("-"):
+                self.interval = max(0.25, self.interval / 2)
+            elif key == curses.KEY_RESIZE:
+                self.lines.clear()
+                self.stdscr.erase()
+                next_tick = 0.0
+            elif key == -1:
+                time.sleep(min(0.05, max(0.0, next_tick - time.monotonic())))
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="hwtop.py", description="Linfo terminal mode")
+    parser.add_argument("--tui", action="store_true", help="live terminal view (no GUI)")
+    parser.add_argument("--once", action="store_true", help="print one snapshot and exit")
+    parser.add_argument("--json", action="store_true", help="with --once, print JSON")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between samples")
+    args = parser.parse_args(argv)
+
+    if args.once:
+        return run_once(args.json)
+
+    import curses
+    return curses.wrapper(lambda stdscr: TerminalView(stdscr, args.interval).run())
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
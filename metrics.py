@@ -0,0 +1,71 @@
+from bisect import insort
+
+
+class MetricDescriptor:
+    """
+    Everything known about one metric. `id` is its slot in the sensor's
+    per-metric arrays; `labels` carries indices such as {"core": 3} or
+    {"fan": 0}; `collector` is the key its collector runs under (see
+    Subscriptions); `thresholds` holds the alert rules that watch it.
+    """
+
+    __slots__ = ("id", "name", "unit", "component", "labels", "collector", "rank", "thresholds")
+
+    def __init__(self, id, name, unit, component, labels, collector, rank):
+        self.id = id
+        self.name = name
+        self.unit = unit
+        self.component = component
+        self.labels = labels
+        self.collector = collector
+        self.rank = rank
+        self.thresholds = ()
+
+
+class MetricRegistry:
+    """
+    Assigns each metric a stable integer ID on first registration and keeps
+    every component's metrics in display order as they are added, so
+    neither units nor the component layout are recomputed from key strings.
+    """
+
+    def __init__(self, components=()):
+        self.descriptors = []
+        self.by_name = {}
+        # component -> descriptors sorted by rank, and the matching names.
+        # Components listed up front keep that order even while empty.
+        self.components = {component: [] for component in components}
+        self.layout = {component: [] for component in components}
+
+    def register(self, name, unit="", component=None, labels=None, collector=None, rank=()):
+        """
+        Returns the ID of `name`, registering it first if it is new.
+        """
+        desc = self.by_name.get(name)
+        if desc is not None:
+            return desc.id
+        desc = MetricDescriptor(len(self.descriptors), name, unit, component,
+                                labels or {}, collector or name, rank)
+        self.descriptors.append(desc)
+        self.by_name[name] = desc
+        if component is not None:
+            members = self.components.setdefault(component, [])
+            insort(members, desc, key=lambda d: d.rank)
+            self.layout[component] = [d.name for d in members]
+        return desc.id
+
+    def get(self, name):
+        return self.by_name.get(name)
+
+    def __getitem__(self, metric_id):
+        return self.descriptors[metric_id]
+
+    def __len__(self):
+        return len(self.descriptors)
+
+    def component_map(self):
+        """
+        {component: [metric names in display order]}. The lists are shared;
+        callers must not modify them.
+        """
+        return self.layout
@@ -0,0 +1,101 @@
+import heapq
+import psutil
+
+
+# Attributes refreshed for every process on every tick. Kept short on purpose:
+# each one is a /proc read per PID.
+TICK_ATTRS = ["cpu_percent", "memory_info"]
+
+# Attributes that never change for the life of a PID; fetched once.
+STATIC_ATTRS = ["name", "username"]
+
+SORT_KEYS = {
+    "cpu": lambda row: row.cpu,
+    "memory": lambda row: row.rss,
+    "gpu": lambda row: row.gpu_util,
+    "gpu_memory": lambda row: row.gpu_mem,
+}
+
+
+class ProcessRow:
+    __slots__ = ("pid", "proc", "name", "username", "cpu", "rss", "gpu_mem", "gpu_util", "seen")
+
+    def __init__(self, pid, proc, name, username):
+        self.pid = pid
+        # psutil.Process the row was built from; a reused PID gets a new one
+        self.proc = proc
+        self.name = name
+        self.username = username
+        self.cpu = 0.0
+        self.rss = 0
+        self.gpu_mem = 0
+        self.gpu_util = 0
+        self.seen = 0
+
+
+class ProcessTable:
+    """
+    Incremental process scanner behind the "Processes" tab.
+
+    psutil.process_iter() hands back the same Process objects across calls,
+    so cpu_percent() is a delta against the previous tick without sleeping.
+    We keep our own pid -> ProcessRow cache next to it so static fields are
+    looked up once per process and dead PIDs are dropped in one sweep. A PID
+    reused by a new process comes back as a new Process object, which
+    rebuilds the row.
+    """
+
+    def __init__(self):
+        self.rows = {}
+        self.tick = 0
+        # PIDs that carried GPU values after the last join
+        self.gpu_pids = set()
+
+    def update(self):
+        self.tick += 1
+        tick = self.tick
+        rows = self.rows
+        for proc in psutil.process_iter(TICK_ATTRS):
+            info = proc.info
+            row = rows.get(proc.pid)
+            if row is None or row.proc is not proc:
+                try:
+                    static = proc.as_dict(STATIC_ATTRS, ad_value="?")
+                except psutil.Error:
+                    continue
+                row = ProcessRow(proc.pid, proc, static["name"], static["username"])
+                rows[proc.pid] = row
+            row.cpu = info["cpu_percent"] or 0.0
+            mem = info["memory_info"]
+            row.rss = mem.rss if mem else 0
+            row.seen = tick
+
+        # Drop PIDs that exited since the last scan.
+        dead = [pid for pid, row in rows.items() if row.seen != tick]
+        for pid in dead:
+            del rows[pid]
+
+    def join_gpu(self, usage):
+        """
+        Merge {pid: [gpu_mem, gpu_util]} from GPUProcessCollector into the rows.
+        Work is proportional to the number of GPU processes, not all PIDs.
+        """
+        rows = self.rows
+        for pid in self.gpu_pids.difference(usage):
+            row = rows.get(pid)
+            if row is not None:
+                row.gpu_mem = 0
+                row.gpu_util = 0
+        for pid, (mem, util) in usage.items():
+            row = rows.get(pid)
+            if row is not None:
+                row.gpu_mem = mem
+                row.gpu_util = util
+        self.gpu_pids = set(usage)
+
+    def top(self, n, sort="cpu"):
+        """
+        Return the `n` busiest processes by `sort` (a key of SORT_KEYS).
+        Only these rows are ever handed to the GUI.
+        """
+        return heapq.nlargest(n, self.rows.values(), key=SORT_KEYS[sort])
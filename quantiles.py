@@ -0,0 +1,121 @@
+import math
+from collections import deque
+
+
+# Relative accuracy of every quantile estimate (1 %)
+RELATIVE_ACCURACY = 0.01
+
+# Magnitudes below this are counted as zero
+MIN_MAGNITUDE = 1e-9
+
+# Sliding window for the "recent" percentiles, split into slices that expire whole
+WINDOW_SECONDS = 300
+WINDOW_SLICES = 10
+
+
+class QuantileSketch:
+    """
+    Log-bucketed quantile sketch (the DDSketch scheme). Every value lands
+    in the bucket ceil(log_gamma(|value|)), so any quantile comes back
+    within RELATIVE_ACCURACY of the true sample. Memory is one counter per
+    occupied bucket, which is bounded by the value range rather than the
+    sample count (about 700 buckets span 1 to 1e6), and sketches merge by
+    adding counters.
+    """
+
+    __slots__ = ("positive", "negative", "zero", "count")
+
+    gamma = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+    inv_log_gamma = 1 / math.log(gamma)
+
+    def __init__(self):
+        self.positive = {}
+        self.negative = {}
+        self.zero = 0
+        self.count = 0
+
+    def add(self, value):
+        self.count += 1
+        if value > MIN_MAGNITUDE:
+            index = math.ceil(math.log(value) * self.inv_log_gamma)
+            self.positive[index] = self.positive.get(index, 0) + 1
+        elif value < -MIN_MAGNITUDE:
+            index = math.ceil(math.log(-value) * self.inv_log_gamma)
+            self.negative[index] = self.negative.get(index, 0) + 1
+        else:
+            self.zero += 1
+
+    def merge(self, other):
+        for index, n in other.positive.items():
+            self.positive[index] = self.positive.get(index, 0) + n
+        for index, n in other.negative.items():
+            self.negative[index] = self.negative.get(index, 0) + n
+        self.zero += other.zero
+        self.count += other.count
+
+    def _value(self, index):
+        # Midpoint of (gamma^(i-1), gamma^i] in relative terms
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def quantiles(self, qs):
+        """
+        Estimates for each q in qs (0..1, ascending), or None when empty.
+        """
+        if not self.count:
+            return [None] * len(qs)
+        ranks = [q * (self.count - 1) for q in qs]
+        results = []
+        seen = 0
+
+        def walk():
+            # Buckets from the most negative value up to the largest positive
+            for index in sorted(self.negative, reverse=True):
+                yield self.negative[index], -self._value(index)
+            if self.zero:
+                yield self.zero, 0.0
+            for index in sorted(self.positive):
+                yield self.positive[index], self._value(index)
+
+        for n, value in walk():
+            seen += n
+            while len(results) < len(ranks) and ranks[len(results)] < seen:
+                results.append(value)
+            if len(results) == len(ranks):
+                break
+        return results
+
+
+class MetricQuantiles:
+    """
+    A session-long sketch plus a ring of per-slice sketches covering the
+    last WINDOW_SECONDS. Queries over the window merge the live slices.
+    """
+
+    __slots__ = ("session", "slices")
+
+    def __init__(self):
+        self.session = QuantileSketch()
+        # (slice number, sketch), oldest first
+        self.slices = deque()
+
+    def add(self, now, value):
+        self.session.add(value)
+        slice_id = int(now // (WINDOW_SECONDS / WINDOW_SLICES))
+        if not self.slices or self.slices[-1][0] != slice_id:
+            self.slices.append((slice_id, QuantileSketch()))
+            while self.slices[0][0] <= slice_id - WINDOW_SLICES:
+                self.slices.popleft()
+        self.slices[-1][1].add(value)
+
+    def quantiles(self, qs, now=None):
+        """
+        Session quantiles, or those of the window ending at `now` if given.
+        """
+        if now is None:
+            return self.session.quantiles(qs)
+        oldest = int(now // (WINDOW_SECONDS / WINDOW_SLICES)) - WINDOW_SLICES
+        merged = QuantileSketch()
+        for slice_id, sketch in self.slices:
+            if slice_id > oldest:
+                merged.merge(sketch)
+        return merged.quantiles(qs)
@@ -0,0 +1,110 @@
+import glob
+import os
+
+
+# powercap zone name -> metric prefix. Package zones are "package-N".
+ZONE_METRICS = {
+    "package": "CPU Package",
+    "core": "CPU Core",
+    "dram": "DRAM",
+}
+
+
+class RaplZone:
+    __slots__ = ("path", "metric", "max_range", "last", "energy_uj", "power_id", "energy_id")
+
+    def __init__(self, path, metric, max_range):
+        self.path = path
+        self.metric = metric
+        self.max_range = max_range
+        self.last = None
+        # Energy counted since the session (or last reset) started
+        self.energy_uj = 0
+        # Keys read() reports under; the metric names until bind() sets IDs
+        self.power_id = f"{metric} Power"
+        self.energy_id = f"{metric} Energy"
+
+
+class RaplCollector:
+    """
+    CPU package, core and DRAM power from the powercap energy counters
+    (intel-rapl, also used by AMD Zen). Watts come from energy deltas,
+    corrected for wraparound with max_energy_range_uj, and the same deltas
+    are summed into per-session energy totals.
+    """
+
+    def __init__(self, reader, root="/sys/class/powercap"):
+        self.reader = reader
+        self.zones = []
+        for path in sorted(glob.glob(os.path.join(root, "*-rapl:*"))):
+            # intel-rapl-mmio duplicates the package zone
+            if "mmio" in os.path.basename(path):
+                continue
+            name = reader.read(os.path.join(path, "name")) or ""
+            metric = ZONE_METRICS.get(name.split("-")[0])
+            max_range = reader.read_int(os.path.join(path, "max_energy_range_uj"))
+            if metric is None or not max_range:
+                continue
+            energy_path = os.path.join(path, "energy_uj")
+            # energy_uj is root-only on most kernels
+            if reader.read_int(energy_path) is None:
+                continue
+            self.zones.append(RaplZone(energy_path, metric, max_range))
+        self.last_time = None
+
+    @property
+    def available(self):
+        return bool(self.zones)
+
+    def metrics(self):
+        """
+        Metric keys this collector fills, in display order.
+        """
+        seen = []
+        for zone in self.zones:
+            for key in (f"{zone.metric} Power", f"{zone.metric} Energy"):
+                if key not in seen:
+                    seen.append(key)
+        return seen
+
+    def bind(self, metric_id):
+        """
+        Report under `metric_id(name)` (e.g. a registry ID) instead of the
+        metric names, resolved once here rather than on every read.
+        """
+        for zone in self.zones:
+            zone.power_id = metric_id(zone.power_id)
+            zone.energy_id = metric_id(zone.energy_id)
+
+    def read(self, now):
+        """
+        Returns {key: value}: watts for the power keys and watt-hours for
+        the energy keys (see bind), summed over sockets. Empty on the
+        first call.
+        """
+        watts = {}
+        energy = {}
+        dt = now - self.last_time if self.last_time is not None else None
+        self.last_time = now
+        for zone in self.zones:
+            value = self.reader.read_int(zone.path)
+            if value is None:
+                continue
+            last = zone.last
+            zone.last = value
+            if last is None:
+                continue
+            delta = value - last
+            if delta < 0:
+                delta += zone.max_range
+            zone.energy_uj += delta
+            if dt:
+                watts[zone.power_id] = watts.get(zone.power_id, 0.0) + delta / dt / 1e6
+            energy[zone.energy_id] = energy.get(zone.energy_id, 0.0) + zone.energy_uj / 3.6e9
+        values = {key: round(value, 1) for key, value in watts.items()}
+        values.update({key: round(value, 3) for key, value in energy.items()})
+        return values
+
+    def reset_energy(self):
+        for zone in self.zones:
+            zone.energy_uj = 0
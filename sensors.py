@@ -1,77 +1,230 @@
 import psutil
 import subprocess
+import sys
 import platform
 import re
+import shutil
+import time
+from history import HistoryStore
+from sysfs import SysfsReader
+from gpu_sysfs import discover_gpus, METRICS as GPU_METRICS
+from throttle import ThrottleDetector
+from io_stats import IOStats
+from rapl import RaplCollector
+from quantiles import MetricQuantiles
+from metrics import MetricRegistry
+
+
+# (name, unit, component) of the fixed metrics in display order. A metric's
+# position here is its ID; per-core, per-fan, per-device and RAPL metrics
+# are registered after these as they are discovered.
+STATIC_METRICS = [
+    ("CPU Usage", "%", "CPU"),
+    ("CPU Frequency", "MHz", "CPU"),
+    ("CPU Temperature", "°C", "CPU"),
+    ("GPU Usage", "%", "GPU"),
+    ("GPU Temperature", "°C", "GPU"),
+    ("GPU Core Frequency", "MHz", "GPU"),
+    ("GPU Power", "W", "GPU"),
+    ("GPU Memory", "MiB", "GPU"),
+    ("GPU Memory Frequency", "MHz", "GPU"),
+    ("GPU Memory Usage", "MiB", "GPU"),
+    ("GPU Fan Speed", "%", "GPU"),
+    ("GPU Throttle Temperature", "°C", "GPU"),
+    ("RAM Usage", "%", "RAM"),
+    ("RAM Frequency", "MHz", "RAM"),
+    # Collector key for the per-fan metrics; not shown itself
+    ("GPU Fan Speed RPM", "RPM", None),
+]
+
+(CPU_USAGE, CPU_FREQUENCY, CPU_TEMPERATURE,
+ GPU_USAGE, GPU_TEMPERATURE, GPU_CORE_FREQUENCY, GPU_POWER, GPU_MEMORY,
+ GPU_MEMORY_FREQUENCY, GPU_MEMORY_USAGE, GPU_FAN_SPEED, GPU_THROTTLE_TEMPERATURE,
+ RAM_USAGE, RAM_FREQUENCY, GPU_FAN_SPEED_RPM) = range(len(STATIC_METRICS))
+
+# Components in table order; Disk and Network fill in as devices are seen
+COMPONENTS = ["CPU", "GPU", "RAM", "Disk", "Network"]
 
 
 class sensor:
     # Main class for fetching and tracking our stats
-    def __init__(self):
-        self.stats = {
-            "CPU Usage": [],
-            "CPU Frequency": [],
-            "CPU Temperature": [],
-            "RAM Usage": [],
-            "RAM Frequency": [],
-            "GPU Temperature": [],
-            "GPU Throttle Temperature": [],
-            "GPU Core Frequency": [],
-            "GPU Memory Frequency": [],
-            "GPU Memory": [],
-            "GPU Memory Usage": [],
-            "GPU Fan Speed": [],
-            "GPU Fan Speed RPM": [],
-            "GPU Power": [],
-        }
-
-        self.units = {
-            "CPU Usage": "%",
-            "CPU Frequency": "MHz",
-            "CPU Temperature": "°C",
-            "RAM Usage": "%",
-            "RAM Frequency": "MHz",
-            "GPU Temperature": "°C",
-            "GPU Throttle Temperature": "°C",
-            "GPU Core Frequency": "MHz",
-            "GPU Memory Frequency": "MHz",
-            "GPU Memory": "MiB",
-            "GPU Memory Usage": "MiB",
-            "GPU Fan Speed": "%",
-            "GPU Fan Speed RPM": "RPM",
-            "GPU Power": "W",
-        }
+    def __init__(self, history_retention=24 * 3600, history_compressed=False):
+        # Timestamped history for graphs; self.stats keeps the short Min/Max/Avg window.
+        # The compressed backend trades some CPU on graph queries for far less memory.
+        # A retention of 0 keeps no per-metric history at all (events still land
+        # in self.history), for front ends that never draw graphs.
+        self.history = HistoryStore(history_retention, compressed=history_compressed)
+        self.keep_history = history_retention > 0
+        self.now = time.time()
+
+        # Optional alerts.AlertEngine (see attach_alerts), evaluated on every sample
+        self.alerts = None
+
+        # Every metric gets an integer ID; the per-metric state lives in
+        # slot lists indexed by it. self.stats maps names to the same
+        # window lists for readers that work by name.
+        self.registry = MetricRegistry(COMPONENTS)
+        self.stats = {}
+        self.windows = []
+        self.series = []
+        # Streaming p50/p95/p99 per metric, over the session and a sliding window
+        self.sketches = []
+        for rank, (name, unit, component) in enumerate(STATIC_METRICS):
+            self.register(name, unit, component, rank=(rank,))
+        self.core_ids = []
+        self.fan_ids = []
+        # (kind, device) -> (read/rx ID, write/tx ID)
+        self.device_ids = {}
+
+        # Persistent fds shared by every sysfs/procfs based collector
+        self.sysfs = SysfsReader()
+
+        # AMD/Intel cards are read from sysfs; nvidia-smi stays the NVIDIA path
+        self.sysfs_gpus = discover_gpus(reader=self.sysfs)
+        if shutil.which("nvidia-smi"):
+            self.gpu_backend = "nvidia"
+        elif self.sysfs_gpus:
+            self.gpu_backend = "sysfs"
+        else:
+            # Nothing to query; skip the GPU collectors instead of failing every tick
+            self.gpu_backend = None
+
+        # CPU/DRAM power and session energy from the RAPL counters
+        self.rapl = RaplCollector(self.sysfs)
+        self.rapl_ids = {}
+        for n, key in enumerate(self.rapl.metrics()):
+            dram = key.startswith("DRAM")
+            self.rapl_ids[key] = self.register(
+                key, "W" if key.endswith(" Power") else "Wh", "RAM" if dram else "CPU",
+                collector="CPU Power", rank=(RAM_FREQUENCY if dram else CPU_TEMPERATURE, n))
+        self.rapl.bind(self.rapl_ids.get)
+
+        # Disk and network throughput from /proc, one read per file per tick.
+        # Each new device registers its metrics once; rates come back by ID.
+        self.io = IOStats(self.sysfs, device_ids=self.device_ids_for)
+
+        # (collector key, metric ID) for each value of SysfsGPU.read()
+        self.sysfs_gpu_ids = [
+            ("GPU Fan Speed RPM", None) if key == "GPU Fan Speed RPM" else (key, self.registry.get(key).id)
+            for key in GPU_METRICS
+        ]
+
+        # Throttle episodes are recorded as events in self.history
+        self.throttle = ThrottleDetector(self.sysfs, self.history, nvidia=self.gpu_backend == "nvidia")
 
         self.component_names = {
             "CPU": self.get_cpu_name(),
             "GPU": self.get_gpu_name(),
         }
 
+    def register(self, name, unit="", component=None, labels=None, collector=None, rank=()):
+        """
+        Register a metric (see MetricRegistry.register) and give it slots.
+        Returns its ID.
+        """
+        metric_id = self.registry.register(name, unit, component, labels, collector, rank)
+        while len(self.windows) < len(self.registry):
+            desc = self.registry[len(self.windows)]
+            window = []
+            self.windows.append(window)
+            self.stats[desc.name] = window
+            # Created on the first sample
+            self.series.append(None)
+            self.sketches.append(MetricQuantiles())
+            if self.alerts is not None:
+                desc.thresholds = self.alerts.rules_for(desc.name)
+        return metric_id
+
+    def attach_alerts(self, alerts):
+        """
+        Evaluate `alerts` (an alerts.AlertEngine) on every sample.
+        """
+        self.alerts = alerts
+        for desc in self.registry.descriptors:
+            desc.thresholds = alerts.rules_for(desc.name)
+
+    def unit_for(self, key):
+        # Returns the unit string for a given stat key
+        desc = self.registry.get(key)
+        return desc.unit if desc is not None else ""
+
+    def component_map(self):
+        """
+        Metric keys shown under each component, in display order.
+        Shared by the GUI table and the terminal view.
+        """
+        return self.registry.component_map()
+
+    def core_ids_for(self, count):
+        # IDs of "Core N Frequency" for the first `count` cores
+        for i in range(len(self.core_ids), count):
+            self.core_ids.append(self.register(
+                f"Core {i} Frequency", "MHz", "CPU", {"core": i}, "CPU Frequency",
+                (len(STATIC_METRICS), i)))
+        return self.core_ids
+
+    def fan_ids_for(self, count):
+        # IDs of "GPU Fan Speed RPM N" for the first `count` fans
+        for i in range(len(self.fan_ids), count):
+            self.fan_ids.append(self.register(
+                f"GPU Fan Speed RPM {i}", "RPM", "GPU", {"gpu": 0, "fan": i}, "GPU Fan Speed RPM",
+                (GPU_FAN_SPEED, i)))
+        return self.fan_ids
+
+    def device_ids_for(self, kind, name):
+        # IDs of the two throughput metrics of a disk or network interface;
+        # IOStats calls this once per new device
+        ids = self.device_ids.get((kind, name))
+        if ids is None:
+            if kind == "disk":
+                ids = (self.register(f"Disk {name} Read", "MB/s", "Disk", {"disk": name}, "Disk", (name, 0)),
+                       self.register(f"Disk {name} Write", "MB/s", "Disk", {"disk": name}, "Disk", (name, 1)))
+            else:
+                ids = (self.register(f"Net {name} RX", "KB/s", "Network", {"interface": name}, "Network", (name, 0)),
+                       self.register(f"Net {name} TX", "KB/s", "Network", {"interface": name}, "Network", (name, 1)))
+            self.device_ids[(kind, name)] = ids
+        return ids
+
     def update_stats(self, key, value):
+        # Name-based entry point; collectors on the hot path use update_slot
+        desc = self.registry.get(key)
+        metric_id = desc.id if desc is not None else self.register(key)
+        return self.update_slot(metric_id, value)
+
+    def update_slot(self, metric_id, value):
         if value == "Unknown" or value is None:
             return "Unknown"
 
         try:
             # Convert value to float (if numeric) and update the history.
             value = float(value)
-            if key not in self.stats:
-                self.stats[key] = []
-            self.stats[key].append(value)
-
-            # If more than 50 entries, preserve the current min and max.
-            if len(self.stats[key]) > 50:
-                current_min = min(self.stats[key])
-                current_max = max(self.stats[key])
-                removed = False
-                for i in range(len(self.stats[key])):
-                    if self.stats[key][i] != current_min and self.stats[key][i] != current_max:
-                        self.stats[key].pop(i)
-                        removed = True
-                        break
-                if not removed:
-                    self.stats[key].pop(0)
-            return value
         except ValueError:
             return "Unknown"
+        window = self.windows[metric_id]
+        window.append(value)
+        if self.keep_history:
+            series = self.series[metric_id]
+            if series is None:
+                series = self.series[metric_id] = self.history.series(self.registry[metric_id].name)
+            self.history.append_to(series, self.now, value)
+        self.sketches[metric_id].add(self.now, value)
+        thresholds = self.registry[metric_id].thresholds
+        if thresholds:
+            self.alerts.evaluate_rules(thresholds, value, self.now)
+
+        # If more than 50 entries, preserve the current min and max.
+        if len(window) > 50:
+            current_min = min(window)
+            current_max = max(window)
+            removed = False
+            for i in range(len(window)):
+                if window[i] != current_min and window[i] != current_max:
+                    window.pop(i)
+                    removed = True
+                    break
+            if not removed:
+                window.pop(0)
+        return value
 
     def get_cpu_name(self):
         try:
@@ -80,6 +233,8 @@ class sensor:
             return platform.processor()
 
     def get_gpu_name(self):
+        if self.gpu_backend == "sysfs":
+            return self.sysfs_gpus[0].name()
         try:
             output = subprocess.check_output(
                 ["nvidia-smi", "--query-gpu=name", "--format=csv,noheader"], text=True
@@ -136,6 +291,20 @@ class sensor:
             pass
         return "Unknown"
 
+    def get_gpu_usage(self):
+        """
+        Uses nvidia-smi to read GPU utilization (percent).
+        Returns int or 'Unknown'.
+        """
+        try:
+            output = subprocess.check_output(
+                ["nvidia-smi", "--query-gpu=utilization.gpu", "--format=csv,noheader,nounits"],
+                text=True
+            )
+            return int(output.strip())
+        except:
+            return "Unknown"
+
     def get_gpu_fan_speed_percent(self):
         """
         Uses nvidia-smi to read GPU Fan speed (percent).
@@ -171,8 +340,8 @@ class sensor:
                 else:
                     # If no numeric value is found, assume this index is not valid.
                     break
-            except subprocess.CalledProcessError:
-                # The query failed; assume no more fans exist.
+            except (subprocess.CalledProcessError, FileNotFoundError):
+                # The query failed (or nvidia-settings is missing); assume no more fans exist.
                 break
         return fan_list
 
@@ -294,66 +463,162 @@ class sensor:
             if match:
                 return int(match.group(1))
             else:
-                print(f"Warning: Could not parse throttle temperature. Output: {output}")
+                print(f"Warning: Could not parse throttle temperature. Output: {output}", file=sys.stderr)
                 return "Unknown"
-        except subprocess.CalledProcessError as e:
-            print(f"Warning: Error getting throttle temperature: {e}")
+        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+            print(f"Warning: Error getting throttle temperature: {e}", file=sys.stderr)
             return "Unknown"
 
-    def update_all(self):
+    def collector_key(self, key):
+        """
+        Map a metric key to the key its collector runs under, so that
+        per-core and per-fan keys are covered by their parent metric.
+        """
+        desc = self.registry.get(key)
+        if desc is not None:
+            return desc.collector
+        # Component names, and metrics named in alert rules before discovery
+        if key.startswith("Core ") and key.endswith(" Frequency"):
+            return "CPU Frequency"
+        if key.startswith("GPU Fan Speed RPM"):
+            return "GPU Fan Speed RPM"
+        # Every RAPL power/energy key comes from one read of the counters
+        if key.startswith(("CPU ", "DRAM ")) and key.endswith((" Power", " Energy")):
+            return "CPU Power"
+        # Per-device throughput keys are produced by one collector each; the
+        # component names "Disk" and "Network" map to themselves
+        if key.startswith("Disk"):
+            return "Disk"
+        if key.startswith("Net"):
+            return "Network"
+        return key
+
+    def reset_energy(self):
+        """
+        Start a new energy measurement, e.g. at the beginning of a job.
+        """
+        self.rapl.reset_energy()
+        for key, metric_id in self.rapl_ids.items():
+            if key.endswith(" Energy"):
+                self.windows[metric_id].clear()
+                self.sketches[metric_id] = MetricQuantiles()
+
+    def percentiles(self, key, qs, window=False):
+        """
+        Estimated quantiles of a metric (qs in 0..1, ascending), over the
+        whole session or only the recent sliding window.
+        """
+        desc = self.registry.get(key)
+        if desc is None:
+            return [None] * len(qs)
+        return self.sketches[desc.id].quantiles(qs, self.now if window else None)
+
+    def update_all(self, wanted=None):
         """
         Fetch the latest values for each metric and update self.stats.
+        `wanted` is an optional set of collector keys (see collector_key);
+        metrics outside it are not sampled. None means everything. Keys
+        with no collector here (e.g. the GUI's "Processes" tab) are ignored.
         Returns a tuple or list of per-core frequencies if needed by the GUI.
         """
+        # One timestamp per tick, shared by every metric's history
+        self.now = time.time()
+
+        def want(key):
+            return wanted is None or key in wanted
+
         # CPU Usage
-        self.update_stats("CPU Usage", psutil.cpu_percent())
+        if want("CPU Usage"):
+            self.update_slot(CPU_USAGE, psutil.cpu_percent())
 
         # CPU Frequency and per-core frequencies
-        cpu_freq, per_core_freqs = self.get_cpu_frequency()
-        self.update_stats("CPU Frequency", cpu_freq)
-        for i, freq in enumerate(per_core_freqs):
-            self.update_stats(f"Core {i} Frequency", freq)
+        per_core_freqs = []
+        if want("CPU Frequency"):
+            cpu_freq, per_core_freqs = self.get_cpu_frequency()
+            self.update_slot(CPU_FREQUENCY, cpu_freq)
+            for metric_id, freq in zip(self.core_ids_for(len(per_core_freqs)), per_core_freqs):
+                self.update_slot(metric_id, freq)
 
         # CPU Temperature
-        self.update_stats("CPU Temperature", self.get_cpu_temperature())
+        if want("CPU Temperature"):
+            self.update_slot(CPU_TEMPERATURE, self.get_cpu_temperature())
 
         # RAM Usage
-        self.update_stats("RAM Usage", psutil.virtual_memory().percent)
+        if want("RAM Usage"):
+            self.update_slot(RAM_USAGE, psutil.virtual_memory().percent)
 
         # RAM Frequency
-        self.update_stats("RAM Frequency", self.get_ram_frequency())
-
-        # GPU Core Frequency
-        self.update_stats("GPU Core Frequency", self.get_gpu_frequency())
-
-        # GPU Power
-        self.update_stats("GPU Power", self.get_gpu_power())
+        if want("RAM Frequency"):
+            self.update_slot(RAM_FREQUENCY, self.get_ram_frequency())
+
+        # CPU package/core and DRAM power (RAPL)
+        if want("CPU Power"):
+            for metric_id, value in self.rapl.read(self.now).items():
+                self.update_slot(metric_id, value)
+
+        # Disk throughput per device
+        if want("Disk"):
+            for (read_id, write_id), (read, write) in self.io.disk_rates(self.now):
+                self.update_slot(read_id, read)
+                self.update_slot(write_id, write)
+
+        # Network throughput per interface
+        if want("Network"):
+            for (rx_id, tx_id), (rx, tx) in self.io.net_rates(self.now):
+                self.update_slot(rx_id, rx)
+                self.update_slot(tx_id, tx)
+
+        if self.gpu_backend == "sysfs":
+            self.update_sysfs_gpu(want)
+        elif self.gpu_backend == "nvidia":
+            self.update_nvidia_gpu(want)
+
+        # Throttle detection (not a metric; results land in history.events)
+        if want("Throttling"):
+            self.throttle.update(self.now)
 
-        # GPU Temperature
-        self.update_stats("GPU Temperature", self.get_gpu_temperature())
-
-        # GPU Memory Frequency
-        self.update_stats("GPU Memory Frequency", self.get_gpu_memory_frequency())
-
-        # GPU Memory Usage
-        self.update_stats("GPU Memory Usage", self.get_gpu_memory_usage())
-
-        # GPU Memory Total
-        self.update_stats("GPU Memory", self.get_gpu_memory_total())
+        return per_core_freqs
 
-        # GPU Fan Speed (percent)
-        self.update_stats("GPU Fan Speed", self.get_gpu_fan_speed_percent())
+    def update_sysfs_gpu(self, want):
+        """
+        Fill the GPU metrics from the first AMD/Intel card in sysfs.
+        """
+        for (key, metric_id), value in zip(self.sysfs_gpu_ids, self.sysfs_gpus[0].read()):
+            if not want(key):
+                continue
+            if metric_id is None:
+                # The card's single fan is fan 0
+                metric_id = self.fan_ids_for(1)[0]
+            self.update_slot(metric_id, value)
+
+    def update_nvidia_gpu(self, want):
+        """
+        Fill the GPU metrics via nvidia-smi / nvidia-settings.
+        Each metric is its own query, so unwanted ones cost nothing.
+        """
+        collectors = [
+            (GPU_USAGE, self.get_gpu_usage),
+            (GPU_CORE_FREQUENCY, self.get_gpu_frequency),
+            (GPU_POWER, self.get_gpu_power),
+            (GPU_TEMPERATURE, self.get_gpu_temperature),
+            (GPU_MEMORY_FREQUENCY, self.get_gpu_memory_frequency),
+            (GPU_MEMORY_USAGE, self.get_gpu_memory_usage),
+            (GPU_MEMORY, self.get_gpu_memory_total),
+            (GPU_FAN_SPEED, self.get_gpu_fan_speed_percent),
+        ]
+        for metric_id, collect in collectors:
+            if want(self.registry[metric_id].collector):
+                self.update_slot(metric_id, collect())
 
         # GPU Fan Speed RPM: update each fan separately using the list from the sensor
-        fan_rpm = self.get_gpu_fan_speed_rpm()
-        if isinstance(fan_rpm, list):
-            for idx, rpm in enumerate(fan_rpm):
-                self.update_stats(f"GPU Fan Speed RPM {idx}", rpm)
-        else:
-            self.update_stats("GPU Fan Speed RPM", fan_rpm)
+        if want("GPU Fan Speed RPM"):
+            fan_rpm = self.get_gpu_fan_speed_rpm()
+            if isinstance(fan_rpm, list):
+                for metric_id, rpm in zip(self.fan_ids_for(len(fan_rpm)), fan_rpm):
+                    self.update_slot(metric_id, rpm)
+            else:
+                self.update_slot(GPU_FAN_SPEED_RPM, fan_rpm)
 
         # GPU Throttle Temperature
-        self.update_stats("GPU Throttle Temperature", self.get_gpu_throttle_temperature())
-
-        return per_core_freqs
-
+        if want("GPU Throttle Temperature"):
+            self.update_slot(GPU_THROTTLE_TEMPERATURE, self.get_gpu_throttle_temperature())
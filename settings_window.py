@@ -4,12 +4,15 @@ from PyQt6.QtCore import QSettings
 from PyQt6.QtGui import QIcon
 from install import resource_path
 
+# Metrics that can be shown live in the tray icon ("None" keeps icon.svg)
+TRAY_METRICS = ["None", "CPU Usage", "CPU Temperature", "GPU Usage", "GPU Temperature", "RAM Usage"]
+
 class SettingsWindow(QWidget):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Settings")
         self.setWindowIcon(QIcon(resource_path("icon.svg")))
-        self.setFixedSize(300, 200)
+        self.setFixedSize(300, 390)
         layout = QVBoxLayout()
 
         self.settings = QSettings("Linfo", "LinfoApp")
@@ -32,6 +35,31 @@ class SettingsWindow(QWidget):
         self.polling_combo.setCurrentText(current)
         layout.addWidget(self.polling_combo)
 
+        # History retention for graphs
+        layout.addWidget(QLabel("History Retention (hours):"))
+        self.retention_combo = QComboBox()
+        self.retention_combo.addItems(["1", "6", "24", "168"])
+        current_retention = str(self.settings.value("history_retention_hours", 24, type=int))
+        self.retention_combo.setCurrentText(current_retention)
+        layout.addWidget(self.retention_combo)
+
+        self.history_compressed_cb = QCheckBox("Compress history (applies on restart)")
+        self.history_compressed_cb.setChecked(self.settings.value("history_compressed", False, type=bool))
+        layout.addWidget(self.history_compressed_cb)
+
+        # Live tray icon
+        layout.addWidget(QLabel("Tray Icon Metric:"))
+        self.tray_metric_combo = QComboBox()
+        self.tray_metric_combo.addItems(TRAY_METRICS)
+        self.tray_metric_combo.setCurrentText(self.settings.value("tray_metric", "None"))
+        layout.addWidget(self.tray_metric_combo)
+
+        layout.addWidget(QLabel("Tray Icon Style:"))
+        self.tray_style_combo = QComboBox()
+        self.tray_style_combo.addItems(["number", "graph"])
+        self.tray_style_combo.setCurrentText(self.settings.value("tray_style", "number"))
+        layout.addWidget(self.tray_style_combo)
+
         # Theme selection dropdown
         layout.addWidget(QLabel("Theme:"))
         self.theme_combo = QComboBox()
@@ -51,6 +79,10 @@ class SettingsWindow(QWidget):
         self.settings.setValue("start_minimized", self.start_minimized_cb.isChecked())
         self.settings.setValue("cpu_expanded", self.cpu_expanded_cb.isChecked())
         self.settings.setValue("polling_interval", int(self.polling_combo.currentText()))
+        self.settings.setValue("history_retention_hours", int(self.retention_combo.currentText()))
+        self.settings.setValue("history_compressed", self.history_compressed_cb.isChecked())
+        self.settings.setValue("tray_metric", self.tray_metric_combo.currentText())
+        self.settings.setValue("tray_style", self.tray_style_combo.currentText())
         self.settings.setValue("theme", self.theme_combo.currentText())
 
         self.close()
@@ -0,0 +1,42 @@
+class Subscriptions:
+    """
+    Tracks which metrics each consumer (table, graph, tray, alerts, ...) needs.
+
+    A consumer subscribes with the set of metric keys it reads and whether it
+    needs them at the normal polling rate (`fast`) or can live with the
+    low-power cadence. The sampler collects only wanted() and picks its
+    interval from fast().
+    """
+
+    def __init__(self, normalize=None):
+        # Maps a metric key to the key its collector is registered under
+        self.normalize = normalize or (lambda key: key)
+        self.consumers = {}
+        self._wanted = None
+
+    def subscribe(self, consumer, metrics, fast=True):
+        metrics = frozenset(self.normalize(key) for key in metrics)
+        if not metrics:
+            self.unsubscribe(consumer)
+            return
+        if self.consumers.get(consumer) != (metrics, fast):
+            self.consumers[consumer] = (metrics, fast)
+            self._wanted = None
+
+    def unsubscribe(self, consumer):
+        if self.consumers.pop(consumer, None) is not None:
+            self._wanted = None
+
+    def wanted(self):
+        """
+        Union of all active subscriptions (cached until they change).
+        """
+        if self._wanted is None:
+            wanted = set()
+            for metrics, _ in self.consumers.values():
+                wanted |= metrics
+            self._wanted = frozenset(wanted)
+        return self._wanted
+
+    def fast(self):
+        return any(fast for _, fast in self.consumers.values())
@@ -0,0 +1,110 @@
+import os
+
+
+class SysfsReader:
+    """
+    Keeps sysfs/procfs attribute files open between ticks and re-reads them
+    with pread(), so a sample costs one syscall instead of open/read/close.
+    """
+
+    def __init__(self, max_open=None):
+        # Optional cap on cached fds; the least recently opened is closed first
+        self.max_open = max_open
+        self._fds = {}
+
+    def _fd(self, path):
+        fd = self._fds.get(path)
+        if fd is None:
+            try:
+                fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+            except OSError:
+                return None
+            if self.max_open is not None and len(self._fds) >= self.max_open:
+                self.forget(next(iter(self._fds)))
+            self._fds[path] = fd
+        return fd
+
+    def forget(self, path):
+        fd = self._fds.pop(path, None)
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def read_bytes(self, path, size=4096):
+        """
+        Read the whole file from offset 0. Returns bytes or None.
+        Files larger than `size` (e.g. /proc/diskstats) are read in chunks.
+        """
+        fd = self._fd(path)
+        if fd is None:
+            return None
+        try:
+            data = os.pread(fd, size, 0)
+            if len(data) < size:
+                return data
+            chunks = [data]
+            offset = len(data)
+            while True:
+                chunk = os.pread(fd, size, offset)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                offset += len(chunk)
+            return b"".join(chunks)
+        except OSError:
+            # Device went away (hotplug, driver reload); reopen next time.
+            self.forget(path)
+            return None
+
+    def read_into(self, path, buf):
+        """
+        Read the whole file into the caller's bytearray, growing it in place
+        if the file does not fit. Returns the byte count or None. Lets
+        per-tick readers of large /proc files reuse one buffer.
+        """
+        fd = self._fd(path)
+        if fd is None:
+            return None
+        try:
+            total = 0
+            while True:
+                if total == len(buf):
+                    buf.extend(bytes(len(buf)))
+                with memoryview(buf) as view:
+                    n = os.preadv(fd, [view[total:]], total)
+                if n == 0:
+                    return total
+                total += n
+        except OSError:
+            self.forget(path)
+            return None
+
+    def read(self, path):
+        """
+        Read a text attribute, stripped. Returns str or None.
+        """
+        data = self.read_bytes(path)
+        if data is None:
+            return None
+        return data.decode(errors="replace").strip()
+
+    def read_int(self, path):
+        """
+        Read an integer attribute. Returns int or None.
+        """
+        data = self.read_bytes(path, 64)
+        if data is None:
+            return None
+        try:
+            return int(data)
+        except ValueError:
+            return None
+
+    def close(self):
+        for path in list(self._fds):
+            self.forget(path)
+
+    def __del__(self):
+        self.close()
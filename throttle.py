@@ -0,0 +1,153 @@
+import glob
+import os
+import subprocess
+import psutil
+
+
+# clocks_event_reasons bits that cost performance. Idle (0x1), application
+# clock settings (0x2), sync boost (0x10) and display clocks (0x100) are
+# requested slowdowns, not throttling.
+GPU_THROTTLE_REASONS = {
+    0x4: "SW power cap",
+    0x8: "HW slowdown",
+    0x20: "SW thermal slowdown",
+    0x40: "HW thermal slowdown",
+    0x80: "HW power brake",
+}
+GPU_IDLE = 0x1
+
+# Older drivers only know the pre-rename field
+GPU_REASON_FIELDS = ["clocks_event_reasons.active", "clocks_throttle_reasons.active"]
+
+# Weight of each new unthrottled sample in the clock baseline
+EWMA_ALPHA = 0.05
+
+
+class ThrottleEpisode:
+    __slots__ = ("source", "start", "end", "causes", "baseline", "loss_sum", "samples")
+
+    def __init__(self, source, start, baseline):
+        self.source = source
+        self.start = start
+        self.end = start
+        self.causes = set()
+        self.baseline = baseline
+        self.loss_sum = 0.0
+        self.samples = 0
+
+    def add(self, now, causes, clock):
+        self.end = now
+        self.causes |= causes
+        if self.baseline is not None:
+            self.loss_sum += max(0.0, self.baseline - clock)
+        self.samples += 1
+
+    def clock_loss(self):
+        """
+        Mean clock lost against the pre-episode baseline, in MHz.
+        """
+        return self.loss_sum / self.samples if self.samples else 0.0
+
+    def as_event(self):
+        loss = self.clock_loss()
+        return {
+            "type": "throttle",
+            "source": self.source,
+            "start": self.start,
+            "end": self.end,
+            "cause": ", ".join(sorted(self.causes)),
+            "clock_loss_mhz": round(loss),
+            "clock_loss_pct": round(100 * loss / self.baseline, 1) if self.baseline else 0.0,
+        }
+
+
+class ThrottleDetector:
+    """
+    Streaming throttle detection for the CPU (thermal_throttle counters in
+    sysfs) and NVIDIA GPUs (clocks_event_reasons). Keeps an EWMA baseline of
+    each clock while it runs unthrottled, and records every episode with its
+    cause and estimated clock loss via history.add_event().
+    """
+
+    def __init__(self, reader, history, root="/sys/devices/system/cpu", nvidia=True):
+        self.reader = reader
+        self.history = history
+        self.counter_paths = sorted(glob.glob(os.path.join(root, "cpu[0-9]*", "thermal_throttle", "*_throttle_count")))
+        self.last_counts = {}
+        self.nvidia = nvidia
+        self.gpu_field = 0
+        self.baselines = {}
+        self.open = {}
+
+    def _cpu_causes(self):
+        causes = set()
+        for path in self.counter_paths:
+            count = self.reader.read_int(path)
+            if count is None:
+                continue
+            last = self.last_counts.get(path)
+            self.last_counts[path] = count
+            if last is not None and count > last:
+                kind = "package" if os.path.basename(path).startswith("package") else "core"
+                causes.add(f"thermal ({kind})")
+        return causes
+
+    def _gpu_state(self):
+        """
+        Returns (causes, sm clock MHz, idle) or None if unavailable.
+        """
+        while self.gpu_field < len(GPU_REASON_FIELDS):
+            field = GPU_REASON_FIELDS[self.gpu_field]
+            try:
+                output = subprocess.check_output(
+                    ["nvidia-smi", f"--query-gpu={field},clocks.sm", "--format=csv,noheader,nounits"],
+                    text=True, stderr=subprocess.DEVNULL
+                )
+                break
+            except FileNotFoundError:
+                self.nvidia = False
+                return None
+            except subprocess.CalledProcessError:
+                # Unknown field on this driver; try the older name
+                self.gpu_field += 1
+        else:
+            self.nvidia = False
+            return None
+        try:
+            reasons, clock = [p.strip() for p in output.splitlines()[0].split(",")]
+            reasons = int(reasons, 16)
+            clock = float(clock)
+        except (IndexError, ValueError):
+            return None
+        causes = {name for bit, name in GPU_THROTTLE_REASONS.items() if reasons & bit}
+        return causes, clock, bool(reasons & GPU_IDLE)
+
+    def _track(self, source, now, causes, clock, idle=False):
+        episode = self.open.get(source)
+        if causes:
+            if episode is None:
+                episode = self.open[source] = ThrottleEpisode(source, now, self.baselines.get(source))
+            episode.add(now, causes, clock)
+            return
+        if episode is not None:
+            self.history.add_event(episode.as_event())
+            del self.open[source]
+        if not idle:
+            baseline = self.baselines.get(source)
+            self.baselines[source] = clock if baseline is None else baseline + EWMA_ALPHA * (clock - baseline)
+
+    def update(self, now):
+        if self.counter_paths:
+            try:
+                clock = psutil.cpu_freq().current
+            except Exception:
+                clock = None
+            if clock is not None:
+                self._track("CPU", now, self._cpu_causes(), clock)
+        if self.nvidia:
+            state = self._gpu_state()
+            if state is not None:
+                self._track("GPU", now, *state)
+
+    def ongoing(self):
+        return [episode.as_event() for episode in self.open.values()]
@@ -1,17 +1,162 @@
+import os
+import subprocess
 import sys
+import tempfile
+from collections import OrderedDict
 from PyQt6.QtWidgets import QSystemTrayIcon, QMenu
-from PyQt6.QtGui import QIcon, QCursor, QGuiApplication, QAction
+from PyQt6.QtCore import Qt, QRectF
+from PyQt6.QtGui import QIcon, QCursor, QGuiApplication, QAction, QPixmap, QPainter, QColor, QFont
+
+ICON_SIZE = 64
+GRAPH_POINTS = 16
+# Rendered icons kept around; values tend to hover, so most ticks hit the cache
+ICON_CACHE_SIZE = 128
 
 
 def is_wayland():
     return QGuiApplication.platformName().lower() == "wayland"
 
+
+def format_tray_value(value):
+    # The text is the visual quantisation step: same text, same icon
+    if value >= 1000:
+        return f"{value / 1000:.1f}k"
+    return str(int(round(value)))
+
+
+# ---------------------------------------------
+# Live icon rendering shared by both trays
+# ---------------------------------------------
+class TrayRenderer:
+    """
+    Draws the live tray icon from a background layer and a text/graph layer.
+    Both layers are cached, and render_*() return None while the quantised
+    picture is unchanged, so an idle tick costs a string compare.
+    """
+
+    def __init__(self, size=ICON_SIZE):
+        self.size = size
+        self.key = None
+        # Alert badge colour drawn in the top-right corner, or None
+        self.badge = None
+        self._background = None
+        self._static = None
+        self._glyphs = {}
+
+    def background(self):
+        if self._background is None:
+            pixmap = QPixmap(self.size, self.size)
+            pixmap.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QColor("#1e1e1e"))
+            painter.drawRoundedRect(QRectF(0, 0, self.size, self.size), self.size / 6, self.size / 6)
+            painter.end()
+            self._background = pixmap
+        return self._background
+
+    def glyph(self, text, color):
+        key = (text, color)
+        pixmap = self._glyphs.get(key)
+        if pixmap is None:
+            pixmap = QPixmap(self.size, self.size)
+            pixmap.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+            font = QFont()
+            font.setBold(True)
+            font.setPixelSize(int(self.size * (0.6 if len(text) <= 2 else 0.42)))
+            painter.setFont(font)
+            painter.setPen(QColor(color))
+            painter.drawText(pixmap.rect(), Qt.AlignmentFlag.AlignCenter, text)
+            painter.end()
+            if len(self._glyphs) >= ICON_CACHE_SIZE:
+                self._glyphs.clear()
+            self._glyphs[key] = pixmap
+        return pixmap
+
+    def set_badge(self, color):
+        if color != self.badge:
+            self.badge = color
+            self.key = None
+
+    def _compose(self, layer, background=None):
+        pixmap = QPixmap(background or self.background())
+        painter = QPainter(pixmap)
+        layer(painter)
+        if self.badge:
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QColor(self.badge))
+            d = self.size * 0.36
+            painter.drawEllipse(QRectF(self.size - d, 0, d, d))
+        painter.end()
+        return pixmap
+
+    def render_static(self, icon_path):
+        """
+        The regular app icon, plus the alert badge if one is set.
+        """
+        key = ("s", self.badge)
+        if key == self.key:
+            return None
+        self.key = key
+        if self._static is None:
+            self._static = QIcon(icon_path).pixmap(self.size, self.size)
+        return key, self._compose(lambda painter: None, self._static)
+
+    def render_number(self, value, color="#e0e0e0"):
+        """
+        Returns (key, QPixmap) when the displayed text changes, else None.
+        """
+        text = format_tray_value(value)
+        key = ("n", text, color, self.badge)
+        if key == self.key:
+            return None
+        self.key = key
+        glyph = self.glyph(text, color)
+        return key, self._compose(lambda painter: painter.drawPixmap(0, 0, glyph))
+
+    def render_graph(self, values, color="#2d89ef"):
+        """
+        Mini-graph of the last GRAPH_POINTS values, quantised to whole pixels.
+        Returns (key, QPixmap) when any bar height changes, else None.
+        """
+        values = values[-GRAPH_POINTS:]
+        if not values:
+            return None
+        top = max(100.0, max(values))
+        inner = self.size - 8
+        heights = tuple(max(1, int(v / top * inner)) for v in values)
+        key = ("g", heights, color, self.badge)
+        if key == self.key:
+            return None
+        self.key = key
+        bar = inner / GRAPH_POINTS
+
+        def draw(painter):
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QColor(color))
+            x = 4 + (GRAPH_POINTS - len(heights)) * bar
+            for h in heights:
+                painter.drawRect(QRectF(x, 4 + inner - h, max(1.0, bar - 1), h))
+                x += bar
+
+        return key, self._compose(draw)
+
+    def reset(self):
+        self.key = None
+
 # ---------------------------------------------
 # QSystemTrayIcon version (for X11)
 # ---------------------------------------------
 class QtTray:
     def __init__(self, parent, icon_path):
         self.parent = parent
+        self.icon_path = icon_path
+        self.renderer = TrayRenderer()
+        self._icons = OrderedDict()
         self.tray_icon = QSystemTrayIcon(QIcon(icon_path), parent)
         self.tray_icon.setToolTip("Linfo running in tray")
 
@@ -32,6 +177,30 @@ class QtTray:
         self.tray_icon.activated.connect(self.on_activated)
         self.tray_icon.show()
 
+    def set_live_icon(self, rendered, tooltip):
+        if rendered is None:
+            return
+        key, pixmap = rendered
+        icon = self._icons.get(key)
+        if icon is None:
+            icon = QIcon(pixmap)
+            self._icons[key] = icon
+            if len(self._icons) > ICON_CACHE_SIZE:
+                self._icons.popitem(last=False)
+        else:
+            self._icons.move_to_end(key)
+        self.tray_icon.setIcon(icon)
+        self.tray_icon.setToolTip(tooltip)
+
+    def set_static_icon(self):
+        self.renderer.reset()
+        self.tray_icon.setIcon(QIcon(self.icon_path))
+        self.tray_icon.setToolTip("Linfo running in tray")
+
+    def notify(self, title, message, critical=False):
+        icon = QSystemTrayIcon.MessageIcon.Critical if critical else QSystemTrayIcon.MessageIcon.Warning
+        self.tray_icon.showMessage(title, message, icon)
+
     def on_activated(self, reason):
         if reason == QSystemTrayIcon.ActivationReason.Trigger:
             self.parent.restore_from_tray()
@@ -46,10 +215,23 @@ class AyatanaTray:
         import gi
         gi.require_version('Gtk', '3.0')
         gi.require_version('AyatanaAppIndicator3', '0.1')
-        from gi.repository import Gtk, AyatanaAppIndicator3 as AppIndicator
+        from gi.repository import Gtk, GLib, AyatanaAppIndicator3 as AppIndicator
         from threading import Thread
 
         self.parent = parent
+        self.icon_path = icon_path
+        self.renderer = TrayRenderer()
+        self.GLib = GLib
+
+        # Icons are handed to the indicator as files. Each distinct picture is
+        # written once under a name derived from its key and reused afterwards.
+        runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+        self.icon_dir = os.path.join(runtime_dir, "linfo-tray")
+        os.makedirs(self.icon_dir, exist_ok=True)
+        for stale in os.listdir(self.icon_dir):
+            if stale.endswith(".png"):
+                os.remove(os.path.join(self.icon_dir, stale))
+        self._files = OrderedDict()
 
         self.indicator = AppIndicator.Indicator.new(
             "linfo-indicator",
@@ -57,6 +239,7 @@ class AyatanaTray:
             AppIndicator.IndicatorCategory.APPLICATION_STATUS
         )
         self.indicator.set_status(AppIndicator.IndicatorStatus.ACTIVE)
+        self.indicator.set_icon_theme_path(self.icon_dir)
 
         self.menu = Gtk.Menu()
 
@@ -78,6 +261,44 @@ class AyatanaTray:
         # Run GTK main loop in the background
         Thread(target=Gtk.main, daemon=True).start()
 
+    def _icon_name(self, key, pixmap):
+        name = self._files.get(key)
+        if name is None:
+            name = f"linfo-{len(self._files)}-{abs(hash(key)):x}"
+            pixmap.save(os.path.join(self.icon_dir, name + ".png"), "PNG")
+            self._files[key] = name
+            if len(self._files) > ICON_CACHE_SIZE:
+                _, old = self._files.popitem(last=False)
+                try:
+                    os.remove(os.path.join(self.icon_dir, old + ".png"))
+                except OSError:
+                    pass
+        else:
+            self._files.move_to_end(key)
+        return name
+
+    def set_live_icon(self, rendered, tooltip):
+        if rendered is None:
+            return
+        key, pixmap = rendered
+        name = self._icon_name(key, pixmap)
+        # GTK calls must run on the GTK thread
+        self.GLib.idle_add(self.indicator.set_icon_full, name, tooltip)
+
+    def set_static_icon(self):
+        self.renderer.reset()
+        self.GLib.idle_add(self.indicator.set_icon_full, self.icon_path, "Linfo")
+
+    def notify(self, title, message, critical=False):
+        # No Qt tray to pop a bubble from; hand it to the desktop's notifier
+        try:
+            subprocess.Popen(
+                ["notify-send", "-a", "Linfo", "-u", "critical" if critical else "normal", title, message],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+        except OSError:
+            print(f"{title}: {message}")
+
 # ---------------------------------------------
 # Public helper
 # ---------------------------------------------